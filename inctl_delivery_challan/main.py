@@ -1,230 +1,647 @@
-from typing import List, Union
-
+import argparse
+import datetime
+import glob
+import os
+import posixpath
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from xml.etree import ElementTree
+
+import numpy as np
 import pandas as pd
+from pandas.io.parsers import TextParser
 
+# Only the first columns of a challan sheet hold the challan and its orders
+MAX_COLUMNS = 15
 
-def split_dataframe_by_value_and_truncate(
-    df: pd.DataFrame,
-    split_column_name: Union[str, int],
-    split_value: str,
-    end_marker_value: str,
-) -> List[pd.DataFrame]:
-    """
-    Splits a DataFrame into smaller DataFrames, where each split starts
-    with a row containing the specified 'split_value' in 'split_column_name'.
+# The columns of the extracted rows
+OUTPUT_COLUMNS = [
+    "Challan No",
+    "Challan Date",
+    "Consignee",
+    "Delivery Mode",
+    "Order No",
+    "Carton",
+    "Pcs",
+    "Country",
+]
 
-    Each resulting split is then truncated to end *before* the first row
-    that contains the 'end_marker_value' in *any* column. Rows before the
-    very first instance of the split_value are also removed.
-    """
+# Where the CLI saves the extracted rows by default
+DEFAULT_OUTPUT_PATH = "challans.xlsx"
 
-    # 1. Find the index of the first occurrence of the split_value
-    first_split_index = df[split_column_name].eq(split_value).idxmax()
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
 
-    # 2. Slice the DataFrame to start from this first split point
-    df_sliced = df.loc[first_split_index:].copy()
+_SHEET_DATA_TAG = f"{_MAIN_NS}sheetData"
+_ROW_TAG = f"{_MAIN_NS}row"
+_CELL_TAG = f"{_MAIN_NS}c"
+_VALUE_TAG = f"{_MAIN_NS}v"
+_INLINE_STRING_TAG = f"{_MAIN_NS}is"
+_SHARED_STRING_TAG = f"{_MAIN_NS}si"
+_TEXT_TAG = f"{_MAIN_NS}t"
+_RUN_TEXT_PATH = f"{_MAIN_NS}r/{_MAIN_NS}t"
 
-    # 3. Create a boolean Series for the splitting points (on the sliced DataFrame)
-    is_split_point = df_sliced[split_column_name] == split_value
+# Built-in number formats (ECMA-376 18.8.30) that show a date or a time
+_BUILTIN_DATE_FORMAT_IDS = set(range(14, 23)) | {45, 46, 47}
+_BUILTIN_TIMEDELTA_FORMAT_IDS = {46}
 
-    # 4. Use cumsum() to create a unique group ID for each segment
-    group_ids = is_split_point.cumsum()
+# Quoted literals and [locale]/[colour] sections, but not elapsed time ([h])
+_FORMAT_LITERALS_RE = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+_DATE_FORMAT_RE = re.compile(r"(?<![_\\])[dmhysDMHYS]")
+_TIMEDELTA_FORMAT_RE = re.compile(
+    r"\[hh?\](:mm(:ss(\.0*)?)?)?|\[mm?\](:ss(\.0*)?)?|\[ss?\](\.0*)?", re.I
+)
 
-    # 5. Group and Truncate the parts
-    split_dfs = []
+_WINDOWS_EPOCH = datetime.datetime(1899, 12, 30)
+_MAC_EPOCH = datetime.datetime(1904, 1, 1)
 
-    for _group_id, group_df in df_sliced.groupby(group_ids):
-        is_end_marker = (group_df == end_marker_value).any(axis=1)
 
-        if is_end_marker.any():
-            first_marker_row_index = is_end_marker.idxmax()
+def _is_date_format(format_code: str) -> bool:
+    format_code = _FORMAT_LITERALS_RE.sub("", format_code.split(";")[0])
+    return _DATE_FORMAT_RE.search(format_code) is not None
 
-            marker_position = group_df.index.get_loc(first_marker_row_index)
 
-            truncated_df = group_df.iloc[:marker_position]
+def _is_timedelta_format(format_code: str) -> bool:
+    return _TIMEDELTA_FORMAT_RE.search(format_code.split(";")[0]) is not None
 
-            if not truncated_df.empty:
-                split_dfs.append(truncated_df)
-        else:
-            split_dfs.append(group_df)
 
-    return split_dfs
+def _column_no(cell_reference: str) -> int:
+    """
+    Returns the 1-based column no. of a cell reference ("AB12" -> 28).
+    """
+    return _column_letters_no(cell_reference.rstrip("0123456789"))
 
 
-def df_find_first_index(df, value_to_find=None):
-    # Stack the DataFrame to get a Series with a MultiIndex (row_label, col_label)
-    stacked_series = df.stack()
+@lru_cache(maxsize=None)
+def _column_letters_no(column_letters: str) -> int:
+    # Cached per column ("AB"), so the cache is as small as the sheets' width
+    column_no = 0
+    for letter in column_letters:
+        column_no = column_no * 26 + ord(letter) - 64
+    return column_no
 
-    # Find the index of the first occurrence
-    try:
-        index_tuple = stacked_series[stacked_series == value_to_find].index[0]
-        return index_tuple
-    except IndexError:
-        return None
 
-
-def df_find_first_pattern_index(df, pattern=None):
+def _from_excel(
+    serial: float, epoch: datetime.datetime, timedelta: bool = False
+) -> Union[datetime.datetime, datetime.time, datetime.timedelta]:
+    """
+    Converts an Excel date serial to a datetime (a time if it's below one day,
+    a timedelta for elapsed time formats), the same as openpyxl does.
+    """
+    if timedelta:
+        td = datetime.timedelta(days=serial)
+        if td.microseconds:
+            td = datetime.timedelta(
+                seconds=td.total_seconds() // 1,
+                microseconds=round(td.microseconds, -3),
+            )
+        return td
+
+    day, fraction = divmod(serial, 1)
+    diff = datetime.timedelta(milliseconds=round(fraction * 86400 * 1000))
+    if 0 <= serial < 1 and diff.days == 0:
+        minutes, seconds = divmod(diff.seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        return datetime.time(hours, minutes, seconds, diff.microseconds)
+    if 0 < serial < 60 and epoch == _WINDOWS_EPOCH:
+        day += 1  # Excel's phantom 1900-02-29
+    return epoch + datetime.timedelta(days=day) + diff
+
+
+def _string_item_text(element: ElementTree.Element) -> str:
+    # The plain text, or the text of every rich text run (phonetic runs aside)
+    text = element.findtext(_TEXT_TAG) or ""
+    return text + "".join(run.text or "" for run in element.iterfind(_RUN_TEXT_PATH))
+
+
+class ChallanWorkbook:
     """
-    Finds the (row_label, col_label) of the first cell value
-    that matches the given regular expression pattern.
+    An open-once, read-only session over a challan workbook.
+
+    The .xlsx is read straight from its zip archive: each sheet's XML is
+    parsed incrementally, a row at a time, and every parsed XML row is
+    dropped once its values are taken, so no element tree of the sheet is
+    built. Only the values of the first `max_col` columns are kept, which
+    the sheet's DataFrame is then built from. Cells are typed the way
+    `pd.read_excel` types them (through openpyxl), and the first row is the
+    header.
 
     Args:
-        df (pd.DataFrame): The input DataFrame.
-        pattern (str): The regular expression pattern to match.
+        file_name: Path of the .xlsx file.
+        max_col: No. of leading columns to read from each sheet.
 
-    Returns:
-        tuple or None: The (row_label, col_label) tuple of the
-                       first match, or None if no match is found.
+    Usage:
+        with ChallanWorkbook(file_name) as workbook:
+            for sheet_name in workbook.sheet_names:
+                df = workbook.read_sheet(sheet_name)
     """
-    if pattern is None:
-        return None
-    # 1. Stack the DataFrame to get a Series with a MultiIndex (row_label, col_label)
-    #    This puts all values into a single column for easy searching.
-    stacked_series = df.stack(
-        future_stack=True
-    )  # Keep NaNs, though str methods handle them
-
-    # 2. Use str.contains() with the regex pattern
-    #    We must handle non-string (e.g., numeric) values by converting them to string
-    #    or handling the error if the value is not a string. 'na=False' treats NaNs as non-matches.
-    mask = stacked_series.astype(str).str.contains(pattern, na=False)
-
-    # 3. Find the index of the first occurrence where the mask is True
-    try:
-        # Get the MultiIndex where the mask is True and take the first one
-        index_tuple = stacked_series[mask].index[0]
-        return index_tuple
-    except IndexError:
-        # This occurs if the Series subset is empty (no match found)
-        return None
 
+    def __init__(self, file_name: str, max_col: int = MAX_COLUMNS) -> None:
+        self.file_name = file_name
+        self.max_col = max_col
+        self._zip = zipfile.ZipFile(file_name)
+        self._shared_strings: Optional[List[str]] = None
 
-def extract_static_values(split):
-    split_columns = list(split.columns)
+        workbook = ElementTree.fromstring(self._zip.read("xl/workbook.xml"))
+        relationships = ElementTree.fromstring(
+            self._zip.read("xl/_rels/workbook.xml.rels")
+        )
+        targets = {
+            relationship.get("Id"): relationship.get("Target")
+            for relationship in relationships.iter(f"{_PKG_REL_NS}Relationship")
+        }
+
+        # Sheet name -> path of its XML in the archive, in workbook order
+        self._sheet_paths: Dict[str, str] = {}
+        for sheet in workbook.iter(f"{_MAIN_NS}sheet"):
+            target = targets[sheet.get(f"{_DOC_REL_NS}id")]
+            if target.startswith("/"):
+                path = target[1:]
+            else:
+                path = posixpath.normpath(posixpath.join("xl", target))
+            self._sheet_paths[sheet.get("name")] = path
+
+        properties = workbook.find(f"{_MAIN_NS}workbookPr")
+        date1904 = properties is not None and properties.get("date1904") in (
+            "1",
+            "true",
+        )
+        self._epoch = _MAC_EPOCH if date1904 else _WINDOWS_EPOCH
+        self._date_styles, self._timedelta_styles = self._read_date_styles()
+
+    def __enter__(self) -> "ChallanWorkbook":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return list(self._sheet_paths)
+
+    def _read_date_styles(self) -> Tuple[Set[int], Set[int]]:
+        """
+        Returns the ids of the cell styles whose number format is a date, and
+        of those that are an elapsed time.
+        """
+        if "xl/styles.xml" not in self._zip.namelist():
+            return set(), set()
+        styles = ElementTree.fromstring(self._zip.read("xl/styles.xml"))
+
+        custom_formats = {
+            int(number_format.get("numFmtId")): number_format.get("formatCode", "")
+            for number_format in styles.iter(f"{_MAIN_NS}numFmt")
+        }
+        date_styles, timedelta_styles = set(), set()
+        cell_formats = styles.find(f"{_MAIN_NS}cellXfs")
+        if cell_formats is None:
+            return date_styles, timedelta_styles
+
+        for style_id, cell_format in enumerate(cell_formats.iter(f"{_MAIN_NS}xf")):
+            format_id = int(cell_format.get("numFmtId", 0))
+            if format_id in custom_formats:
+                format_code = custom_formats[format_id]
+                is_date = _is_date_format(format_code)
+                is_timedelta = _is_timedelta_format(format_code)
+            else:
+                is_date = format_id in _BUILTIN_DATE_FORMAT_IDS
+                is_timedelta = format_id in _BUILTIN_TIMEDELTA_FORMAT_IDS
+            if is_date:
+                date_styles.add(style_id)
+            if is_timedelta:
+                timedelta_styles.add(style_id)
+        return date_styles, timedelta_styles
+
+    @property
+    def shared_strings(self) -> List[str]:
+        """
+        The workbook's shared string table, parsed on first use.
+        """
+        if self._shared_strings is None:
+            self._shared_strings = []
+            if "xl/sharedStrings.xml" in self._zip.namelist():
+                with self._zip.open("xl/sharedStrings.xml") as source:
+                    for _event, element in ElementTree.iterparse(source):
+                        if element.tag == _SHARED_STRING_TAG:
+                            text = _string_item_text(element)
+                            self._shared_strings.append(text.replace("x005F_", ""))
+                            element.clear()
+        return self._shared_strings
+
+    def _convert_cell(self, cell: ElementTree.Element) -> Any:
+        # The value openpyxl reads, with pandas' conversions on top
+        data_type = cell.get("t", "n")
+        if data_type == "inlineStr":
+            inline_string = cell.find(_INLINE_STRING_TAG)
+            if inline_string is None:
+                return ""
+            return _string_item_text(inline_string)
+
+        value = cell.findtext(_VALUE_TAG)
+        if not value:
+            return ""
+        elif data_type == "n":
+            if "." in value or "e" in value or "E" in value:
+                number: Union[int, float] = float(value)
+            else:
+                number = int(value)
+            style_id = int(cell.get("s", 0))
+            if style_id in self._date_styles:
+                try:
+                    return _from_excel(
+                        number,
+                        self._epoch,
+                        timedelta=style_id in self._timedelta_styles,
+                    )
+                except (OverflowError, ValueError):
+                    return np.nan  # Out of the date range, an error cell
+            if int(number) == number:
+                return int(number)
+            return float(number)
+        elif data_type == "s":
+            return self.shared_strings[int(value)]
+        elif data_type == "b":
+            return bool(int(value))
+        elif data_type == "e":
+            return np.nan
+        elif data_type == "d":
+            return datetime.datetime.fromisoformat(value.rstrip("Z"))
+        return value  # "str", a formula's cached string
+
+    def _parse_rows(self, source: IO[bytes]) -> Iterator[Tuple[int, List[Any]]]:
+        """
+        Yields (1-based row no., values of the first `max_col` cells) for every
+        row stored in a sheet's XML.
+        """
+        sheet_data = None
+        row_no = 0
+        for event, element in ElementTree.iterparse(source, ("start", "end")):
+            if event == "start":
+                if element.tag == _SHEET_DATA_TAG:
+                    sheet_data = element
+                continue
+            if element.tag != _ROW_TAG:
+                continue
+
+            row_no = int(element.get("r", row_no + 1))
+            values: List[Any] = []
+            column_no = 0
+            for cell in element.iterfind(_CELL_TAG):
+                reference = cell.get("r")
+                column_no = _column_no(reference) if reference else column_no + 1
+                if column_no > self.max_col:
+                    break
+                if column_no > len(values) + 1:
+                    values.extend([""] * (column_no - len(values) - 1))
+                values.append(self._convert_cell(cell))
+            yield row_no, values
+
+            # Drop the parsed rows, so only the current one is in memory
+            if sheet_data is not None:
+                sheet_data.clear()
+
+    def iter_rows(self, sheet_name: str) -> Iterator[List[Any]]:
+        """
+        Yields the values of the first `max_col` cells of every row of a sheet,
+        from the first row on. Missing rows are yielded as empty lists, and
+        trailing empty cells are left out.
+        """
+        expected_row_no = 1
+        with self._zip.open(self._sheet_paths[sheet_name]) as source:
+            for row_no, values in self._parse_rows(source):
+                for _ in range(expected_row_no, row_no):
+                    yield []
+                expected_row_no = row_no + 1
+
+                while values and values[-1] == "":
+                    values.pop()
+                yield values
+
+    def read_sheet(self, sheet_name: str) -> pd.DataFrame:
+        """
+        Returns a sheet's first `max_col` columns, typed as `pd.read_excel`
+        types them.
+        """
+        rows = []
+        last_row_with_data = -1
+        for row_no, values in enumerate(self.iter_rows(sheet_name)):
+            if values:
+                last_row_with_data = row_no
+            rows.append(values)
+        rows = rows[: last_row_with_data + 1]
+
+        if not rows:
+            return pd.DataFrame()
+        # Always `max_col` columns wide, as `pd.read_excel(...).iloc[:, :max_col]`
+        # is for the (wider) challan sheets
+        rows = [values + [""] * (self.max_col - len(values)) for values in rows]
+        return TextParser(rows, header=0, skip_blank_lines=False).read()
+
+
+def find_split_ranges(
+    df: pd.DataFrame,
+    split_column_name: Union[str, int],
+    split_value: str,
+    end_marker_value: str,
+    marker_columns: Optional[List[Union[str, int]]] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Returns the (start, stop) row positions of each split of a DataFrame, as
+    `split_dataframe_by_value_and_truncate()` splits it.
+
+    The split rows and the end marker rows are each found in one pass over
+    the frame's column arrays, and each split stops at the first end marker
+    row at or after its start (or at the next split). The end marker is only
+    searched for in `marker_columns`, which defaults to every column that can
+    hold text (a numeric column never equals it).
+    """
+    row_count = len(df)
+    if row_count == 0:
+        return []
+
+    is_split_point = df[split_column_name].eq(split_value).to_numpy(dtype=bool)
+
+    if marker_columns is None:
+        marker_positions = [
+            position
+            for position, dtype in enumerate(df.dtypes)
+            if pd.api.types.is_string_dtype(dtype)
+        ]
+    else:
+        marker_positions = list(df.columns.get_indexer(marker_columns))
+    is_end_marker = np.zeros(row_count, dtype=bool)
+    for position in marker_positions:
+        is_end_marker |= df.iloc[:, position].to_numpy() == end_marker_value
+
+    # Rows before the first split are left out, unless there is no split at all
+    starts = np.flatnonzero(is_split_point)
+    if len(starts) == 0:
+        starts = np.zeros(1, dtype=np.intp)
+    split_stops = np.append(starts[1:], row_count)
+
+    marker_rows = np.append(np.flatnonzero(is_end_marker), row_count)
+    marker_stops = marker_rows[np.searchsorted(marker_rows, starts)]
+
+    stops = np.minimum(split_stops, marker_stops)
+    return [
+        (int(start), int(stop)) for start, stop in zip(starts, stops) if stop > start
+    ]
+
+
+def split_dataframe_by_value_and_truncate(
+    df: pd.DataFrame,
+    split_column_name: Union[str, int],
+    split_value: str,
+    end_marker_value: str,
+    marker_columns: Optional[List[Union[str, int]]] = None,
+) -> List[pd.DataFrame]:
+    """
+    Splits a DataFrame into smaller DataFrames, where each split starts
+    with a row containing the specified 'split_value' in 'split_column_name'.
+
+    Each resulting split is then truncated to end *before* the first row
+    that contains the 'end_marker_value' in *any* column (or in
+    'marker_columns', if given). Rows before the very first instance of the
+    split_value are also removed.
+
+    The splits are positional slices of `df` (see `find_split_ranges()`),
+    not copies, and keep its index labels.
+    """
+    return [
+        df.iloc[start:stop]
+        for start, stop in find_split_ranges(
+            df, split_column_name, split_value, end_marker_value, marker_columns
+        )
+    ]
+
+
+class CellIndex:
+    """
+    A value -> first (row, col) position map of a split's cells, built in a
+    single hashing pass, so any number of anchor cells can be looked up
+    without stacking the split again for each one.
+
+    Positions are 0-based (row, col) offsets, which are also the labels of a
+    split after `reset_index(drop=True)`. Rows are converted to a NumPy string
+    view (`str()` of every cell, so NaN reads as "nan") when first scanned.
+
+    Args:
+        df: The split to index.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.values = df.to_numpy(dtype=object)
+        self.col_count = self.values.shape[1]
+
+        # The first occurrence of each value, in row-major order as `stack()`
+        flat_values = pd.Series(self.values.ravel()).dropna()
+        first_values = flat_values.drop_duplicates()
+        self._first_position: Dict[object, int] = dict(
+            zip(first_values.to_numpy(), first_values.index)
+        )
+        self._row_strings: Dict[int, np.ndarray] = {}
+
+    def find(self, value: object) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (row, col) of the first cell equal to `value`, or None if
+        there is none.
+        """
+        position = self._first_position.get(value)
+        if position is None:
+            return None
+        return divmod(position, self.col_count)
+
+    def row_strings(self, row: int) -> np.ndarray:
+        if row not in self._row_strings:
+            self._row_strings[row] = self.values[row].astype(str)
+        return self._row_strings[row]
+
+    def find_pattern(self, pattern: str) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (row, col) of the first cell, in row-major order as
+        `stack()`, whose string matches the regular expression `pattern`, or
+        None if there is none. Only the rows up to the match are converted.
+        """
+        regex = re.compile(pattern)
+        for row in range(len(self.values)):
+            for col, value in enumerate(self.row_strings(row)):
+                if regex.search(value):
+                    return row, col
+        return None
+
+    def scan_row(
+        self, row: int, start_col: int, is_value: Callable[[str], bool]
+    ) -> str:
+        """
+        Returns the first cell string of `row` from `start_col` on that
+        `is_value` accepts. If none does, returns the last cell string (or ""
+        if `start_col` is past the last column).
+        """
+        value = ""
+        for value in self.row_strings(row)[start_col:]:
+            if is_value(value):
+                break
+        return str(value)
+
+
+def extract_static_values(split, cell_index=None):
     static_values = {
         "Challan No": "",
         "Challan Date": "",
         "Consignee": "",
         "Delivery Mode": "",
     }
+    if cell_index is None:
+        cell_index = CellIndex(split)
 
     # extract Challan No
-    challan_no_index = df_find_first_index(split, "Challan No:")
-    challan_no_col_index = split_columns.index(challan_no_index[1])
-
-    challan_no = ""
-    i = 1
-    while (challan_no == "" or challan_no == "nan") and challan_no_col_index + i < len(
-        split_columns
-    ):
-        challan_no = str(split.iloc[challan_no_index[0], challan_no_col_index + i])
-        i += 1
+    row, col = cell_index.find("Challan No:")
+    challan_no = cell_index.scan_row(
+        row, col + 1, lambda value: value not in ("", "nan")
+    )
     static_values["Challan No"] = str(challan_no.replace("O", "0")).strip()
 
     # extract Challan Date
-    challan_date_index = df_find_first_index(split, "Date")
-    challan_date_col_index = split_columns.index(challan_date_index[1])
-
-    challan_date = ""
-    i = 1
-    while len(challan_date) != 19 and challan_date_col_index + i < len(split_columns):
-        challan_date = str(
-            split.iloc[challan_date_index[0], challan_date_col_index + i]
-        ).split(".")[0]
-        i += 1
+    row, col = cell_index.find("Date")
+    challan_date = cell_index.scan_row(
+        row, col + 1, lambda value: len(value.split(".")[0]) == 19
+    ).split(".")[0]
     static_values["Challan Date"] = str(challan_date.split(" ")[0]).strip()
 
     # extract consignee
-    consignee_index = df_find_first_index(split, "To:")
-    consignee_col_index = split_columns.index(consignee_index[1])
-
-    consignee = ""
-    i = 0
-    while (consignee == "" or consignee == "nan") and consignee_col_index + i < len(
-        split_columns
-    ):
-        consignee = str(split.iloc[consignee_index[0] + 1, consignee_col_index + i])
-        i += 1
+    row, col = cell_index.find("To:")
+    consignee = cell_index.scan_row(
+        row + 1, col, lambda value: value not in ("", "nan")
+    )
     static_values["Consignee"] = str(consignee.split("\n")[0]).strip()
 
     # extract Delivery Mode
-    delivery_mode_index = df_find_first_index(split, "Delivery Mode")
-    delivery_mode_col_index = split_columns.index(delivery_mode_index[1])
-
-    delivery_mode = ""
-    i = 1
-    while (
-        delivery_mode == "" or delivery_mode == "nan" or delivery_mode == ":"
-    ) and delivery_mode_col_index + i < len(split_columns):
-        delivery_mode = str(
-            split.iloc[delivery_mode_index[0], delivery_mode_col_index + i]
-        )
-        i += 1
+    row, col = cell_index.find("Delivery Mode")
+    delivery_mode = cell_index.scan_row(
+        row, col + 1, lambda value: value not in ("", "nan", ":")
+    )
     static_values["Delivery Mode"] = str(delivery_mode).strip()
 
     return static_values
 
 
-def extract_one_split(split, split_no, all_values, file_name):
+def extract_one_split(split, split_no, file_name) -> pd.DataFrame:
+    """
+    Returns the order lines of a challan split, with the challan's static
+    values, as a frame of `OUTPUT_COLUMNS` strings.
+    """
     split = split.reset_index(drop=True)
 
-    static_values = extract_static_values(split)
+    cell_index = CellIndex(split)
+    static_values = extract_static_values(split, cell_index)
 
     # Find Order No starting index
     order_no_pattern1 = r"^\d+-\d+$"
     order_no_pattern2 = r"^\d{10}$"
-    order_no_starting_index = df_find_first_pattern_index(
-        df=split, pattern=order_no_pattern1
-    )
+    order_no_starting_index = cell_index.find_pattern(order_no_pattern1)
 
     if order_no_starting_index is None:
-        order_no_starting_index = df_find_first_pattern_index(
-            df=split, pattern=order_no_pattern2
-        )
+        order_no_starting_index = cell_index.find_pattern(order_no_pattern2)
 
     order_df = pd.DataFrame({})
     if order_no_starting_index is not None:
-        order_df = split.loc[order_no_starting_index[0] :, order_no_starting_index[1] :]
+        order_df = split.iloc[
+            order_no_starting_index[0] :, order_no_starting_index[1] :
+        ]
         order_df = order_df.dropna(axis=1, how="all").reset_index(drop=True)
 
-    for row in order_df.itertuples(index=False):
-        order_no, carton, pcs, country = (
-            str(row[0]).strip().replace("\n", ""),
-            str(row[1]).strip().replace("\n", ""),
-            str(row[2]).strip().replace("\n", ""),
-            str(row[3]).strip().replace("\n", ""),
-        )
+    if order_df.empty:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    # The Order No, Carton, Pcs and Country columns, as cleaned strings (of
+    # every cell, so an empty cell reads as "nan")
+    cells = order_df.to_numpy(dtype=object)[:, :4].astype(str)
+    cells = np.strings.replace(np.strings.strip(cells), "\n", "")
+    order_no, carton, pcs, country = cells.T
+
+    # The Order No is only filled in on the first row of each order
+    order_row = np.where(np.strings.str_len(order_no) > 3, np.arange(len(cells)), -1)
+    order_row = np.maximum.accumulate(order_row)
+    order_no = order_no[order_row]
+
+    # Only the rows of an order with a whole (as `int()` reads it), non-zero
+    # no. of cartons
+    unsigned_carton = np.strings.lstrip(carton, "+-")
+    is_order_line = (
+        (order_row >= 0)
+        & np.strings.isdecimal(unsigned_carton)
+        & (np.strings.str_len(carton) - np.strings.str_len(unsigned_carton) <= 1)
+    )
+    # Up to 18 digits always fits an int64, longer ones are read by `int()`
+    # one at a time, so a stray long number can't fail the whole sheet
+    is_int64 = is_order_line & (np.strings.str_len(unsigned_carton) <= 18)
+    cartons = np.zeros(len(cells), dtype=np.int64)
+    cartons[is_int64] = carton[is_int64].astype(np.int64)
+    carton_text = cartons.astype(str).astype(object)
+    is_non_zero = cartons != 0
+    for row in np.flatnonzero(is_order_line & ~is_int64):
+        value = int(carton[row])
+        carton_text[row] = str(value)
+        is_non_zero[row] = value != 0
+    rows = is_order_line & is_non_zero
+
+    order_no = order_no[rows]
+    return pd.DataFrame(
+        {
+            "Challan No": static_values["Challan No"],
+            "Challan Date": static_values["Challan Date"],
+            "Consignee": static_values["Consignee"],
+            "Delivery Mode": static_values["Delivery Mode"],
+            "Order No": np.strings.add(
+                np.strings.add(np.strings.slice(order_no, 6), "-"),
+                np.strings.slice(order_no, -4, np.strings.str_len(order_no)),
+            ),
+            "Carton": carton_text[rows],
+            "Pcs": pcs[rows],
+            "Country": country[rows],
+        },
+        columns=OUTPUT_COLUMNS,
+    ).astype(object)
+
+
+def extract_one_sheet(
+    sheet_name: str, file_name: str, df: Optional[pd.DataFrame] = None
+) -> List[pd.DataFrame]:
+    """
+    Extracts every challan split of a sheet.
 
-        if not (order_no and len(str(order_no)) > 3):
-            order_no = all_values["Order No"][-1]
+    Args:
+        sheet_name: The sheet to extract.
+        file_name: The workbook the sheet is in.
+        df: The sheet, as read by `ChallanWorkbook`. Read from `file_name` if
+            not given.
 
-        try:
-            carton = int(carton)
-            if not carton == 0:
-                # add the static values
-                all_values["Challan No"].append(static_values["Challan No"])
-                all_values["Challan Date"].append(static_values["Challan Date"])
-                all_values["Consignee"].append(static_values["Consignee"])
-                all_values["Delivery Mode"].append(static_values["Delivery Mode"])
-
-                all_values["Order No"].append(f"{order_no[:6]}-{order_no[-4:]}")
-                # all_values["Order No"].append(order_no)
-                all_values["Carton"].append(str(carton))
-                all_values["Pcs"].append(str(pcs))
-                all_values["Country"].append(str(country))
-        except:
-            # print("!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
-            # print(f"Error when extracting order no from '{file_name}'.")
-            # print(
-            #     f"For values: Order no: {order_no}, Carton: {carton}, Pcs: {pcs}, Country: {country}"
-            # )
-            # print(f"For page no: {split_no}")
-            pass
-
-
-def extract_one_sheet(sheet_name, all_values, file_name):
+    Returns:
+        The extracted rows of each split, in sheet order.
+    """
     print("Parsing", sheet_name)
-    df = pd.read_excel(file_name, sheet_name=sheet_name)
+    if df is None:
+        with ChallanWorkbook(file_name) as workbook:
+            df = workbook.read_sheet(sheet_name)
     # print(df)
     # df.to_excel("./data/parsed.xlsx")
 
@@ -239,32 +656,199 @@ def extract_one_sheet(sheet_name, all_values, file_name):
 
     splits = [df.iloc[:, :15] for df in dfs]
 
-    extract_one_split(
-        split=splits[0], split_no=1, all_values=all_values, file_name=file_name
-    )
+    return [
+        extract_one_split(split=split, split_no=split_no, file_name=file_name)
+        for split_no, split in enumerate(splits, start=1)
+    ]
 
 
-file_name = "./data/H&M Challan 2ND CUT OFF WEEK-05.xlsx"
-excel_file = pd.ExcelFile(file_name)
-sheet_names = excel_file.sheet_names
-print("Found the following sheets:")
-print(sheet_names)
+def extract_sheet(
+    file_name: str, sheet_name: str, workbook: Optional[ChallanWorkbook] = None
+) -> Tuple[List[pd.DataFrame], Optional[str]]:
+    """
+    Runs extract_one_sheet() on a sheet, keeping any failure contained.
+
+    Args:
+        file_name: The workbook the sheet is in.
+        sheet_name: The sheet to extract.
+        workbook: The open workbook to read the sheet from. `file_name` is
+                  opened if not given, as in a worker process.
+
+    Returns:
+        The extracted rows of each split, and the failure reason if the
+        extraction raised (otherwise None).
+    """
+    try:
+        if workbook is None:
+            with ChallanWorkbook(file_name) as workbook:
+                df = workbook.read_sheet(sheet_name)
+        else:
+            df = workbook.read_sheet(sheet_name)
+        return (
+            extract_one_sheet(sheet_name=sheet_name, file_name=file_name, df=df),
+            None,
+        )
+    except Exception as e:
+        return [], str(e)
+
+
+def find_challan_files(paths: Iterable[str]) -> List[str]:
+    """
+    Resolves files, folders and glob patterns to the challan workbooks
+    (.xlsx) to process, in input order (each folder or pattern sorted), with
+    duplicates removed.
+    """
+    files_to_process: List[str] = []
+
+    for path_input in paths:
+        cleaned_input = path_input.replace("\\", os.sep)
+        normalized_path_input = os.path.normpath(cleaned_input)
+
+        # An existing file or folder is taken literally, even if its name has
+        # glob characters ('[', '*', '?')
+        if os.path.isfile(normalized_path_input):
+            found_files = [normalized_path_input]
+        elif os.path.isdir(normalized_path_input):
+            found_files = sorted(
+                glob.glob(os.path.join(glob.escape(normalized_path_input), "*.xlsx"))
+            )
+            if not found_files:
+                print(
+                    f"Warning: Folder '{path_input}' was scanned, but no .xlsx files were found."
+                )
+        elif glob.has_magic(normalized_path_input):
+            found_files = sorted(glob.glob(normalized_path_input))
+            if not found_files:
+                print(f"Warning: No files match the pattern '{path_input}'.")
+        else:
+            print(f"Error: The specified path does not exist: '{path_input}'")
+            continue
+
+        for file_path in found_files:
+            file_name = os.path.basename(file_path)
+            if not os.path.isfile(file_path) or file_name.startswith("~$"):
+                continue  # Sub-folders and Excel's lock files
+            if not file_name.lower().endswith(".xlsx"):
+                print(
+                    f"Error: The file '{file_name}' is not an Excel workbook. Extension must be '.xlsx'."
+                )
+                continue
+            file_path = os.path.abspath(file_path)
+            if file_path not in files_to_process:
+                files_to_process.append(file_path)
+
+    return files_to_process
+
+
+def process_challans(
+    paths: Iterable[str], output_path: Optional[str] = None, workers: int = 1
+) -> pd.DataFrame:
+    """
+    Extracts every challan split of every sheet of the given workbooks into
+    one table.
 
+    Args:
+        paths: Challan workbooks, folders of them or glob patterns.
+        output_path: The .xlsx file to save the rows in, if given.
+        workers: No. of worker processes. With more than one, the sheets of
+                 all the workbooks are extracted in parallel, each worker
+                 reading its own sheets.
 
-all_values = {
-    "Challan No": [],
-    "Challan Date": [],
-    "Consignee": [],
-    "Delivery Mode": [],
-    "Order No": [],
-    "Carton": [],
-    "Pcs": [],
-    "Country": [],
-}
+    Returns:
+        The rows of every split, in (workbook, sheet, split) order whatever
+        the no. of workers. A sheet that fails is reported and left out.
+    """
+    files_to_process = find_challan_files(paths)
+    print(f"Found {len(files_to_process)} challan workbook(s). Starting processing...")
+
+    # (workbook, sheet) -> (rows of each split, failure reason)
+    sheet_results: Dict[Tuple[str, str], Tuple[List[pd.DataFrame], Optional[str]]]
+    sheet_results = {}
+    tasks: List[Tuple[str, str]] = []
 
-for sheet_name in sheet_names:
-    extract_one_sheet(sheet_name=sheet_name, all_values=all_values, file_name=file_name)
+    for file_path in files_to_process:
+        file_name = os.path.basename(file_path)
+        try:
+            workbook = ChallanWorkbook(file_path)
+        except Exception as e:
+            print(f"--- Failed to open {file_name}. Reason: {e} ---")
+            continue
+
+        with workbook:
+            print(f"\n--- Found the following sheets in {file_name}: ---")
+            print(workbook.sheet_names)
+            for sheet_name in workbook.sheet_names:
+                tasks.append((file_path, sheet_name))
+                if workers <= 1:
+                    sheet_results[file_path, sheet_name] = extract_sheet(
+                        file_path, sheet_name, workbook
+                    )
+
+    if workers > 1 and tasks:
+        print(f"Processing with {workers} worker processes...")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # `map` yields in submission order, keeping the output stable
+            results = executor.map(
+                extract_sheet,
+                [file_path for file_path, _sheet_name in tasks],
+                [sheet_name for _file_path, sheet_name in tasks],
+            )
+            sheet_results = dict(zip(tasks, results))
 
-extracted_df = pd.DataFrame(all_values)
-print(extracted_df)
-extracted_df.to_excel("./data/out2.xlsx", index=False)
+    split_dfs = []
+    for file_path, sheet_name in tasks:
+        sheet_split_dfs, failure = sheet_results[file_path, sheet_name]
+        if failure is not None:
+            print(
+                f"--- Failed to process sheet '{sheet_name}' of {os.path.basename(file_path)}. Reason: {failure} ---"
+            )
+        split_dfs.extend(sheet_split_dfs)
+
+    if split_dfs:
+        extracted_df = pd.concat(split_dfs, ignore_index=True)
+    else:
+        extracted_df = pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    if output_path is not None:
+        extracted_df.to_excel(output_path, index=False)
+        print(f"Saved {len(extracted_df)} row(s) as {output_path}!")
+    return extracted_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Extract H&M delivery challans from Excel workbooks."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="The challan workbooks, folders of them or glob patterns to process.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=DEFAULT_OUTPUT_PATH,
+        help="The .xlsx file to save all the extracted rows in (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="No. of worker processes to extract sheets in parallel (default: 1).",
+    )
+    args = parser.parse_args()
+
+    paths = args.paths
+    if not paths:
+        path_user_input = input("Enter the folder or single .xlsx file path: ")
+        paths = [path_user_input] if path_user_input.strip() else []
+
+    if args.workers < 1:
+        print("Error: --workers must be at least 1. Exiting.")
+    elif paths:
+        extracted_df = process_challans(
+            paths, output_path=args.output, workers=args.workers
+        )
+        print(extracted_df)
+    else:
+        print("Input cannot be empty. Exiting.")
@@ -1,16 +1,95 @@
+import argparse
 import glob
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
 
-from src import _extract
+from src import _cache, _extract
 
 
-def process_pdfs(path_input: str) -> None:
+def process_one_pdf(
+    file_path: str,
+    page_workers: int = 1,
+    cache_dir: Optional[str] = _cache.DEFAULT_CACHE_DIR,
+    cache_max_bytes: int = _cache.DEFAULT_MAX_BYTES,
+    stream: bool = False,
+) -> Optional[str]:
+    """
+    Runs _extract.main() on a single PDF file, keeping any failure contained.
+
+    If the same PDF content was already extracted by the current extractor
+    version, the cached rows are saved as the output instead. Otherwise the
+    page tables are replayed from the page table cache where possible.
+    A streamed extraction never holds all the rows, so it skips the output
+    cache and only uses the page table cache.
+
+    Args:
+        file_path: The PDF file to process.
+        page_workers: No. of worker processes reading the pages of the file.
+        cache_dir: The cache directory, or None to disable the caches.
+        cache_max_bytes: The size each cache is trimmed back to.
+        stream: Whether to stream the rows to the output in chunks, keeping
+                memory flat on very large POs.
+
+    Returns:
+        The failure reason if the extraction raised, otherwise None.
+    """
+    try:
+        if cache_dir is None:
+            _extract.main(file_path, page_workers=page_workers, stream=stream)
+            return None
+
+        if stream:
+            table_cache = _cache.PageTableCache(cache_dir, cache_max_bytes)
+            _extract.main(
+                file_path,
+                page_workers=page_workers,
+                table_cache=table_cache,
+                stream=True,
+            )
+            return None
+
+        cache = _cache.ResultCache(
+            _extract.EXTRACTOR_VERSION, cache_dir, cache_max_bytes
+        )
+        key = cache.key(file_path)
+        df = cache.get(key)
+        if df is not None:
+            print(f"Found cached output for: {os.path.basename(file_path)}")
+            _extract.save_output(df, file_path)
+        else:
+            table_cache = _cache.PageTableCache(cache_dir, cache_max_bytes)
+            df = _extract.main(
+                file_path, page_workers=page_workers, table_cache=table_cache
+            )
+            cache.put(key, df)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def process_pdfs(
+    path_input: str,
+    workers: int = 1,
+    page_workers: int = 1,
+    cache_dir: Optional[str] = _cache.DEFAULT_CACHE_DIR,
+    cache_max_bytes: int = _cache.DEFAULT_MAX_BYTES,
+    stream: bool = False,
+) -> None:
     """
     Handles file path input, determining if it's a single file or a directory,
     and processes all valid PDF files using _extract.main().
 
     Args:
         path_input: The folder or single PDF file path provided by the user.
+        workers: No. of worker processes. With more than one, the files are
+                 processed in parallel and reported in input order at the end.
+        page_workers: No. of worker processes reading the pages of each file,
+                      which helps with single large POs.
+        cache_dir: The cache directory, or None to always re-extract.
+        cache_max_bytes: The size each cache is trimmed back to.
+        stream: Whether to stream each file's rows to its output in chunks.
     """
     files_to_process = []
 
@@ -39,7 +118,7 @@ def process_pdfs(path_input: str) -> None:
     # --- 3. Directory Check ---
     elif os.path.isdir(path_obj):
         search_pattern = os.path.join(path_obj, "*.pdf")
-        found_files = glob.glob(search_pattern)
+        found_files = sorted(glob.glob(search_pattern))
 
         for file_path in found_files:
             if os.path.isfile(file_path):
@@ -60,23 +139,96 @@ def process_pdfs(path_input: str) -> None:
         print(f"Error: '{path_input}' is an unknown type of file system object.")
         return
 
-    # --- 5. Processing Loop ---
+    process = partial(
+        process_one_pdf,
+        page_workers=page_workers,
+        cache_dir=cache_dir,
+        cache_max_bytes=cache_max_bytes,
+        stream=stream,
+    )
+
+    # --- 5. Parallel Processing ---
+    if workers > 1 and len(files_to_process) > 1:
+        print(f"Processing with {workers} worker processes...")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # `map` yields in submission order, keeping the report stable
+            failures = list(executor.map(process, files_to_process))
+
+        print("\n--- Results ---")
+        for file_path, failure in zip(files_to_process, failures):
+            file_name = os.path.basename(file_path)
+            if failure is None:
+                print(f"--- Successfully processed: {file_name} ---")
+            else:
+                print(f"--- Failed to process {file_name}. Reason: {failure} ---")
+        return
+
+    # --- 6. Processing Loop ---
     for file_path in files_to_process:
         file_name = os.path.basename(file_path)
         print(f"\n--- Starting process for: {file_name} ---")
-        try:
-            _extract.main(file_path)
+        failure = process(file_path)
+        if failure is None:
             print(f"--- Successfully processed: {file_name} ---")
-
-        except Exception as e:
-            print(f"--- Failed to process {file_name}. Reason: {e} ---")
+        else:
+            print(f"--- Failed to process {file_name}. Reason: {failure} ---")
             print("--- Moving to the next file (if any). ---")
 
 
 if __name__ == "__main__":
-    file_path_user_input = input("Enter the folder or single pdf file path: ")
-
-    if file_path_user_input.strip():
-        process_pdfs(file_path_user_input)
+    parser = argparse.ArgumentParser(description="Extract PO data from PDF files.")
+    parser.add_argument(
+        "path", nargs="?", help="The folder or single pdf file path to process."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="No. of worker processes to extract files in parallel (default: 1).",
+    )
+    parser.add_argument(
+        "--page-workers",
+        type=int,
+        default=1,
+        help="No. of worker processes to read the pages of each file (default: 1).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-extract every file instead of reusing cached outputs and tables.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=_cache.DEFAULT_CACHE_DIR,
+        help=f"Directory of the caches (default: {_cache.DEFAULT_CACHE_DIR}).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=_cache.DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Size in MB each cache is trimmed back to (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Extract page by page and write the rows out in chunks, keeping memory flat on very large POs.",
+    )
+    args = parser.parse_args()
+
+    file_path_user_input = args.path
+    if file_path_user_input is None:
+        file_path_user_input = input("Enter the folder or single pdf file path: ")
+
+    if args.workers < 1 or args.page_workers < 1:
+        print("Error: --workers and --page-workers must be at least 1. Exiting.")
+    elif file_path_user_input.strip():
+        process_pdfs(
+            file_path_user_input,
+            workers=args.workers,
+            page_workers=args.page_workers,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+            stream=args.stream,
+        )
     else:
         print("Input cannot be empty. Exiting.")
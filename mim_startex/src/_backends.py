@@ -0,0 +1,187 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+import pandas as pd
+from camelot.core import TableList
+from camelot.parsers import Stream
+from camelot.utils import get_image_char_and_text_objects
+
+from ._document import LAYOUT_KWARGS, PdfDocument
+
+# Tells if a candidate table (first) is as good as the reference table (second)
+TableValidator = Callable[[Optional[pd.DataFrame], Optional[pd.DataFrame]], bool]
+
+
+class TableBackend:
+    """
+    A table extraction engine, reading the table in the given areas of a page.
+
+    Subclasses implement `_read_table()`. `read_table()` times every call, so
+    the backends in use can be compared with `report()`.
+    """
+
+    name = ""
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.page_count = 0
+
+    def read_table(
+        self, document: PdfDocument, page_no: int, table_areas: List[str]
+    ) -> Optional[pd.DataFrame]:
+        """
+        Returns the last table found in `table_areas` ('x1,y1,x2,y2', in PDF
+        coordinates) of a page, or None if none was found.
+        """
+        start = time.perf_counter()
+        df = self._read_table(document, page_no, table_areas)
+        self.seconds += time.perf_counter() - start
+        self.page_count += 1
+        return df
+
+    def _read_table(
+        self, document: PdfDocument, page_no: int, table_areas: List[str]
+    ) -> Optional[pd.DataFrame]:
+        raise NotImplementedError
+
+    def add_timings(self, other: "TableBackend") -> None:
+        """
+        Adds the timings of another instance (e.g. one used in a worker).
+        """
+        self.seconds += other.seconds
+        self.page_count += other.page_count
+
+    def report(self) -> None:
+        if self.page_count:
+            print(
+                f"Table backend ({self.name}) read {self.page_count} page(s) in {self.seconds:.2f}s."
+            )
+
+
+class CamelotStreamBackend(TableBackend):
+    """
+    Camelot's stream flavour, run over the document's cached page layouts.
+    One parser is kept for every page the instance reads.
+    """
+
+    name = "camelot-stream"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._parser: Optional[Stream] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The parser holds the last page's layout, a worker makes its own
+        state = self.__dict__.copy()
+        state["_parser"] = None
+        return state
+
+    def _read_table(
+        self, document: PdfDocument, page_no: int, table_areas: List[str]
+    ) -> Optional[pd.DataFrame]:
+        if self._parser is None:
+            self._parser = Stream()
+
+        layout, dim = document.page_layout(page_no)
+        images, _chars, horizontal_text, vertical_text = (
+            get_image_char_and_text_objects(layout)
+        )
+
+        self._parser.table_areas = table_areas
+        self._parser.prepare_page_parse(
+            document.file_name,
+            layout,
+            dim,
+            page_no,
+            images,
+            horizontal_text,
+            vertical_text,
+            layout_kwargs=LAYOUT_KWARGS,
+        )
+        tables = TableList(sorted(self._parser.extract_tables()))
+        return tables[-1].df if tables.n > 0 else None
+
+
+class PdfplumberBackend(TableBackend):
+    """
+    pdfplumber's `extract_table`, with text based row and column detection,
+    over the same (memoised) page objects.
+    """
+
+    name = "pdfplumber"
+    table_settings = {"vertical_strategy": "text", "horizontal_strategy": "text"}
+
+    def _read_table(
+        self, document: PdfDocument, page_no: int, table_areas: List[str]
+    ) -> Optional[pd.DataFrame]:
+        page = document.page(page_no)
+
+        # pdfplumber measures from the top of the page, camelot from the bottom
+        x1, y1, x2, y2 = (float(value) for value in table_areas[-1].split(","))
+        bbox = (
+            min(x1, x2),
+            page.height - max(y1, y2),
+            max(x1, x2),
+            page.height - min(y1, y2),
+        )
+        table = page.crop(bbox).extract_table(self.table_settings)
+        if not table:
+            return None
+        return pd.DataFrame(table).fillna("")
+
+
+# The first backend is the reference the others are validated against
+BACKENDS: List[Type[TableBackend]] = [CamelotStreamBackend, PdfplumberBackend]
+
+# (template name, page kind) -> backend picked for it
+_selected_backends: Dict[Tuple[str, str], Type[TableBackend]] = {}
+
+
+def tables_equal(df: Optional[pd.DataFrame], reference: Optional[pd.DataFrame]) -> bool:
+    if df is None or reference is None:
+        return df is None and reference is None
+    return df.equals(reference)
+
+
+def select_backend(
+    template_name: str,
+    page_kind: str,
+    document: PdfDocument,
+    page_no: int,
+    table_areas: List[str],
+    is_valid: TableValidator = tables_equal,
+) -> TableBackend:
+    """
+    Returns a new instance of the fastest backend that reads a valid table
+    for this kind of page of this template.
+
+    The first time a (template, page kind) is seen, a sample page is read by
+    every backend in `BACKENDS`. A backend's table is valid if `is_valid`
+    accepts it against the reference (first) backend's table. The choice is
+    kept for every later PO of the template. If the reference backend finds
+    no table on the sample page, nothing can be validated, so the reference
+    is used and the choice is made again on the next PO.
+    """
+    key = (template_name, page_kind)
+    if key not in _selected_backends:
+        reference_backend = BACKENDS[0]()
+        reference = reference_backend.read_table(document, page_no, table_areas)
+        if reference is None:
+            return BACKENDS[0]()
+
+        selected = reference_backend
+        for backend_class in BACKENDS[1:]:
+            backend = backend_class()
+            try:
+                df = backend.read_table(document, page_no, table_areas)
+            except Exception as e:
+                print(f"Warning: Table backend ({backend.name}) failed: {e}")
+                continue
+            if backend.seconds < selected.seconds and is_valid(df, reference):
+                selected = backend
+
+        print(
+            f"Using the {selected.name} table backend for {template_name} {page_kind} pages."
+        )
+        _selected_backends[key] = type(selected)
+    return _selected_backends[key]()
@@ -1,26 +1,101 @@
-from typing import Any, List, Optional, Tuple
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import camelot
 import pandas as pd
-from camelot import utils
+from camelot.utils import get_image_char_and_text_objects
 
+from . import _tables
+from ._backends import TableBackend
+from ._cache import PageTableCache
+from ._document import PdfDocument
 
-def extract_barcodes_from_page(
-    file_name: str,
-    table_coords: List[str],
+BARCODE_COLUMNS = ["Colour Code", "Colour Description", "Size", "Barcode"]
+# Text lines whose tops are this close (pt) are on the same row, as in camelot
+ROW_TOLERANCE = 2
+
+
+def _is_barcode_row(row: List[str]) -> bool:
+    return len(row) == len(BARCODE_COLUMNS) and row[-1].isdigit()
+
+
+def read_barcode_table(
+    document: PdfDocument,
     page_number: int,
+    table_areas: List[str],
     barcode_starting_page_no: int,
-) -> pd.DataFrame:
-    tables = camelot.read_pdf(
-        filepath=file_name,
-        pages=str(page_number),
-        flavor="stream",
-        table_areas=table_coords,
+) -> Optional[pd.DataFrame]:
+    """
+    Reads a barcode page straight from the positions of its text lines,
+    without running camelot's stream table detection.
+
+    The barcode pages are a plain four column listing, and every cell is a
+    text line of its own, so the text lines are grouped into rows by their
+    tops and ordered by their left edges. The result has the same rows as
+    the camelot table from the barcode header (on the barcode starting page)
+    or the first barcode row (on the later pages) on, so
+    `extract_barcodes_from_page` reads both the same way.
+
+    Returns:
+        The table, or None if the page is not a plain barcode listing (camelot
+        should read it instead).
+    """
+    layout, _dim = document.page_layout(page_number)
+    _images, _chars, horizontal_text, _vertical_text = get_image_char_and_text_objects(
+        layout
     )
 
-    if tables.n > 0:
-        df = tables[-1].df
+    # Keep the text lines inside the (single) table area
+    _x1, y1, _x2, y2 = (float(value) for value in table_areas[0].split(","))
+    top, bottom = max(y1, y2), min(y1, y2)
+    text_lines = [
+        text_line
+        for text_line in horizontal_text
+        if bottom <= text_line.y0
+        and text_line.y1 <= top
+        and text_line.get_text().strip()
+    ]
+    text_lines.sort(key=lambda text_line: (-text_line.y1, text_line.x0))
+
+    # Group the text lines into rows, top to bottom, and each row's cells
+    # left to right
+    row_lines: List[List[Any]] = []
+    row_top = 0.0
+    for text_line in text_lines:
+        if row_lines and row_top - text_line.y1 <= ROW_TOLERANCE:
+            row_lines[-1].append(text_line)
+        else:
+            row_lines.append([text_line])
+            row_top = text_line.y1
+    rows = [
+        [line.get_text().strip() for line in sorted(lines, key=lambda line: line.x0)]
+        for lines in row_lines
+    ]
+
+    if page_number == barcode_starting_page_no:
+        if BARCODE_COLUMNS not in rows:
+            return None
+        table_start = rows.index(BARCODE_COLUMNS)
+        barcode_rows = rows[table_start + 1 :]
+    else:
+        table_start = next(
+            (i for i, row in enumerate(rows) if _is_barcode_row(row)), None
+        )
+        if table_start is None:
+            return None
+        barcode_rows = rows[table_start:]
+
+    if not barcode_rows or not all(_is_barcode_row(row) for row in barcode_rows):
+        return None
+    return pd.DataFrame(rows[table_start:])
+
 
+def extract_barcodes_from_page(
+    df: Optional[pd.DataFrame],
+    page_number: int,
+    barcode_starting_page_no: int,
+) -> pd.DataFrame:
+    if df is not None:
         found_barcode = False
         k = 0
         while not found_barcode and k <= len(df):
@@ -51,41 +126,203 @@ def extract_barcodes_from_page(
     return pd.DataFrame({})
 
 
-def get_all_barcodes_df(
-    file_name: str, barcode_starting_page_no: int, total_pages: int
-) -> pd.DataFrame:
-    print("Fetching all the barcodes...")
-    print("============================")
+def barcode_tables_equal(
+    df: Optional[pd.DataFrame],
+    reference: Optional[pd.DataFrame],
+    page_number: int,
+    barcode_starting_page_no: int,
+) -> bool:
+    """
+    Tells if two tables of a barcode page hold the same barcode rows, for
+    validating a table backend against camelot.
+    """
+    try:
+        barcodes_df = extract_barcodes_from_page(
+            df, page_number, barcode_starting_page_no
+        )
+        reference_barcodes_df = extract_barcodes_from_page(
+            reference, page_number, barcode_starting_page_no
+        )
+    except Exception:
+        return False
+    if barcodes_df.shape[1] < 3 or reference_barcodes_df.shape[1] < 3:
+        return False
+    return (
+        barcodes_df.iloc[:, -3:].values.tolist()
+        == reference_barcodes_df.iloc[:, -3:].values.tolist()
+    )
 
-    _layout, dim = utils.get_page_layout(file_name)
 
-    # The dimensions are stored in the `dim` variable as a tuple: (width, height)
-    width = dim[0]
-    height = dim[1]
-    # Define the coordinates for the table area
-    # Format: 'x1,y1,x2,y2'
-    header_offset = 300  # 300 from the second page of barcode, 350 for the first page
-    table_coords = [f"0,{height-header_offset},{width}, 0"]
+class BarcodeIndex:
+    """
+    A (colour, size) -> barcode lookup built once from the barcode table.
 
-    all_barcodes_df = pd.DataFrame({})
-    for page_number in range(barcode_starting_page_no, total_pages + 1):
+    Replaces filtering the whole barcode table on every lookup. The first
+    barcode listed for a key wins, as the filtered `.iloc[0]` did. Keys listed
+    more than once and keys looked up but not found are kept for `report()`.
+
+    Rows can be added all at once or one barcode page at a time with `add()`.
+
+    Args:
+        barcodes_df: The barcode table, with the colour, size and barcode
+                     in its last three columns.
+    """
+
+    def __init__(self, barcodes_df: Optional[pd.DataFrame] = None) -> None:
+        self._barcodes: Dict[Tuple[str, str], str] = {}
+        self.duplicate_keys: Dict[Tuple[str, str], List[str]] = {}
+        self.missing_keys: List[Tuple[str, str]] = []
+
+        if barcodes_df is not None:
+            self.add(barcodes_df)
+
+    def __len__(self) -> int:
+        return len(self._barcodes)
+
+    def add(self, barcodes_df: pd.DataFrame) -> None:
+        if barcodes_df.shape[1] < 3:
+            return
+
+        for color_code, size, barcode in zip(
+            barcodes_df.iloc[:, -3], barcodes_df.iloc[:, -2], barcodes_df.iloc[:, -1]
+        ):
+            key = (color_code, size)
+            if key not in self._barcodes:
+                self._barcodes[key] = barcode
+            elif key in self.duplicate_keys:
+                self.duplicate_keys[key].append(barcode)
+            else:
+                self.duplicate_keys[key] = [self._barcodes[key], barcode]
+
+    def get(self, color_code: str, size: str) -> Optional[str]:
+        key = (color_code, size)
+        if key not in self._barcodes:
+            self.missing_keys.append(key)
+            return None
+        return self._barcodes[key]
+
+    def report(self) -> None:
+        """
+        Prints the duplicate keys found in the barcode table and the keys that
+        couldn't be found during the extraction.
+        """
+        for (color_code, size), barcodes in self.duplicate_keys.items():
+            print(
+                f"Warning: Found {len(barcodes)} barcodes for color code ({color_code}), size ({size}): {barcodes}. Used {barcodes[0]}."
+            )
+        if self.missing_keys:
+            print(f"Warning: Couldn't fetch {len(self.missing_keys)} barcode(s)!")
+
+
+def iter_barcodes_dfs(
+    document: PdfDocument,
+    barcode_starting_page_no: int,
+    total_pages: int,
+    workers: int = 1,
+    table_cache: Optional[PageTableCache] = None,
+    table_areas: Optional[List[str]] = None,
+    backend: Optional[TableBackend] = None,
+    window_pages: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yields the barcode rows of each barcode page, in page order.
+
+    `table_areas` are the camelot table areas of the barcode pages, by default
+    the page below a 300pt header. `backend` reads the pages
+    `read_barcode_table` can't, by default camelot's stream flavour.
+
+    With `window_pages`, the pages are read (by the `workers`) that many at a
+    time, and each page is released from `document` once its rows are taken,
+    so memory doesn't grow with the no. of barcode pages. The windows run on
+    `executor` if given (see `_tables.iter_page_tables_parallel`).
+    """
+    if table_areas is None:
+        header_offset = (
+            300  # 300 from the second page of barcode, 350 for the first page
+        )
+        table_areas = _tables.get_table_areas(document, header_offset)
+
+    page_numbers = range(barcode_starting_page_no, total_pages + 1)
+    table_areas_by_page = {page_number: table_areas for page_number in page_numbers}
+    # Camelot only reads the pages `read_barcode_table` can't
+    page_parser = partial(
+        read_barcode_table, barcode_starting_page_no=barcode_starting_page_no
+    )
+    if workers > 1 and window_pages is not None:
+        page_tables = _tables.iter_page_tables_parallel(
+            document,
+            table_areas_by_page,
+            workers,
+            window_pages,
+            table_cache,
+            page_parser,
+            backend,
+            executor,
+        )
+    elif workers > 1:
+        page_tables = sorted(
+            _tables.read_page_tables_parallel(
+                document,
+                table_areas_by_page,
+                workers,
+                table_cache,
+                page_parser,
+                backend,
+            ).items()
+        )
+    else:
+        page_tables = _tables.iter_page_tables(
+            document, table_areas_by_page, table_cache, page_parser, backend
+        )
+
+    for page_number, df in page_tables:
         barcodes_df = extract_barcodes_from_page(
-            file_name, table_coords, page_number, barcode_starting_page_no
+            df, page_number, barcode_starting_page_no
         )
-        all_barcodes_df = pd.concat([all_barcodes_df, barcodes_df], ignore_index=True)
+        if window_pages is not None:
+            document.release_page(page_number)
+        yield barcodes_df
 
-    return all_barcodes_df
 
+def get_barcode_index(
+    document: PdfDocument,
+    barcode_starting_page_no: int,
+    total_pages: int,
+    workers: int = 1,
+    table_cache: Optional[PageTableCache] = None,
+    table_areas: Optional[List[str]] = None,
+    backend: Optional[TableBackend] = None,
+    window_pages: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> BarcodeIndex:
+    """
+    Builds the barcode index page by page, without keeping the barcode table.
+    See `iter_barcodes_dfs` for `window_pages` and `executor`.
+    """
+    print("Fetching all the barcodes...")
+    print("============================")
 
-def get_barcode(df: pd.DataFrame, color_code: str, size: str) -> Optional[str]:
-    try:
-        # 1. Define your conditions
-        condition_A = df.iloc[:, -3] == color_code
-        condition_B = df.iloc[:, -2] == size
-
-        # 2. Use .loc to filter based on both conditions and select 'col c'
-        res = df.loc[condition_A & condition_B, :]
-        res = res.iloc[0, -1]
-        return res
-    except:
+    barcode_index = BarcodeIndex()
+    for barcodes_df in iter_barcodes_dfs(
+        document,
+        barcode_starting_page_no,
+        total_pages,
+        workers,
+        table_cache,
+        table_areas,
+        backend,
+        window_pages,
+        executor,
+    ):
+        barcode_index.add(barcodes_df)
+    return barcode_index
+
+
+def get_barcode(
+    barcode_index: BarcodeIndex, color_code: str, size: str
+) -> Optional[str]:
+    barcode = barcode_index.get(color_code, size)
+    if barcode is None:
         print(f"Couldn't fetch barcode for color code ({color_code}), size ({size})!)")
+    return barcode
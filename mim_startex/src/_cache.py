@@ -0,0 +1,178 @@
+import hashlib
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import camelot
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"
+)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+
+def file_digest(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    A directory of pickled values (DataFrames, mostly) with least-recently-used
+    eviction once the directory grows past `max_bytes`.
+
+    Entries are written atomically (to a temporary file, then renamed), and a
+    read refreshes an entry's modification time, which is what eviction
+    orders by. Several processes can share the same directory.
+
+    Args:
+        cache_dir: The directory to keep the entries in. Created if missing.
+        max_bytes: The size the directory is trimmed back to after a write.
+    """
+
+    suffix = ".pkl"
+    compression: Optional[str] = None
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{self.suffix}")
+
+    def load(self, key: str) -> Any:
+        """
+        Returns the value stored under `key`.
+
+        Raises:
+            KeyError: If there is no (readable) entry for `key`.
+        """
+        path = self._path(key)
+        try:
+            value = pd.read_pickle(path, compression=self.compression)
+            os.utime(path)
+        except FileNotFoundError:
+            raise KeyError(key)
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable cache entry ({path}): {e}")
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            return self.load(key)
+        except KeyError:
+            return None
+
+    def put(self, key: str, value: Any, evict: bool = True) -> None:
+        """
+        Stores `value` under `key`. Pass `evict=False` when storing a batch of
+        entries, and call `evict()` once after the batch.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            pd.to_pickle(value, temp_path, compression=self.compression)
+            os.replace(temp_path, self._path(key))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        if evict:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.suffix):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _mtime, size, _path in self._entries())
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used entries until the cache fits in
+        `max_bytes`.
+        """
+        entries = sorted(self._entries())
+        total_size = sum(size for _mtime, size, _path in entries)
+
+        for _mtime, size, path in entries:
+            if total_size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Already evicted by another process
+            total_size -= size
+
+
+class ResultCache(DiskCache):
+    """
+    Caches the extracted rows of each PO PDF, keyed by the PDF's content hash
+    and the extractor version.
+    """
+
+    def __init__(
+        self,
+        extractor_version: str,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        super().__init__(os.path.join(cache_dir, "results"), max_bytes)
+        self.extractor_version = extractor_version
+
+    def key(self, file_path: str) -> str:
+        return f"{file_digest(file_path)}-v{self.extractor_version}"
+
+
+class PageTableCache(DiskCache):
+    """
+    Caches the raw camelot table of each (PDF content hash, page, table area),
+    so the post-processing stages can be re-run without parsing the PDF again.
+
+    Entries are gzip compressed pickles of the table DataFrame (or of None
+    when the area held no table). The key also covers the table backend, the
+    camelot version and the layout parameters, since all of them change the
+    tables produced.
+    """
+
+    compression = "gzip"
+
+    def __init__(
+        self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        super().__init__(os.path.join(cache_dir, "tables"), max_bytes)
+
+    def key(
+        self,
+        digest: str,
+        page_no: int,
+        table_areas: List[str],
+        layout_kwargs: Dict[str, Any],
+        backend_name: str = "camelot-stream",
+    ) -> str:
+        area_digest = hashlib.sha256(
+            repr(
+                (
+                    table_areas,
+                    sorted(layout_kwargs.items()),
+                    backend_name,
+                    camelot.__version__,
+                )
+            ).encode()
+        ).hexdigest()[:16]
+        return f"{digest}-p{page_no}-{area_digest}"
@@ -0,0 +1,133 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pdfplumber
+
+from ._cache import file_digest
+
+# Same defaults `camelot.utils.get_page_layout` uses, so the cached layouts
+# produce the exact tables `camelot.read_pdf` would.
+LAYOUT_KWARGS: Dict[str, Any] = {
+    "line_overlap": 0.5,
+    "char_margin": 1.0,
+    "line_margin": 0.5,
+    "word_margin": 0.1,
+    "boxes_flow": 0.5,
+    "detect_vertical": True,
+    "all_texts": True,
+}
+
+
+class PdfDocument:
+    """
+    An open-once session over a single PO PDF.
+
+    The file is opened a single time and every page's text, pdfminer layout
+    and dimensions are computed on first use and then memoised, so the
+    static value, barcode and dynamic value stages can share the same parse.
+
+    Each page is interpreted and laid out by pdfminer only once: pdfplumber
+    runs the layout analysis with camelot's parameters, and both the page
+    text and the camelot stream tables are built from that one `LTPage`.
+
+    Args:
+        file_name: Path of the PDF file.
+        keep_layouts: Whether to keep a page's layout once its text is
+                      extracted. Without it, only the text is memoised and the
+                      layout is laid out again if a table is read from the
+                      page, which bounds the memory of a pass over every page.
+
+    Usage:
+        with PdfDocument(file_name) as document:
+            text = document.page_text(1)
+    """
+
+    def __init__(self, file_name: str, keep_layouts: bool = True) -> None:
+        self.file_name = file_name
+        self.keep_layouts = keep_layouts
+        self._pdf = pdfplumber.open(file_name, laparams=LAYOUT_KWARGS)
+        self._digest: Optional[str] = None
+        self._text_by_page: Dict[int, str] = {}
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pdf.close()
+
+    @property
+    def digest(self) -> str:
+        """
+        The SHA-256 of the file's content, computed on first use.
+        """
+        if self._digest is None:
+            self._digest = file_digest(self.file_name)
+        return self._digest
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pdf.pages)
+
+    def page(self, page_no: int) -> pdfplumber.page.Page:
+        """
+        Returns the pdfplumber page (1-based).
+        """
+        return self._pdf.pages[page_no - 1]
+
+    def page_text(self, page_no: int) -> str:
+        """
+        Returns the text of a page (1-based), extracting it on first use.
+        """
+        if page_no not in self._text_by_page:
+            page = self.page(page_no)
+            self._text_by_page[page_no] = page.extract_text()
+            if not self.keep_layouts:
+                page.close()
+        return self._text_by_page[page_no]
+
+    def text_by_page(self, page_no_list: Optional[List[int]] = None) -> List[str]:
+        """
+        Returns the texts of the given pages (1-based), or of every page if
+        `page_no_list` is None.
+        """
+        if page_no_list is None:
+            page_no_list = list(range(1, self.page_count + 1))
+        return [self.page_text(page_no) for page_no in page_no_list]
+
+    def iter_page_texts(
+        self, first_page_no: int = 1, last_page_no: Optional[int] = None
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Yields (page no., text) from `first_page_no` to `last_page_no`
+        (inclusive, defaults to the last page), extracting each text only when
+        it is reached. Stop iterating early to skip the remaining pages.
+        """
+        if last_page_no is None:
+            last_page_no = self.page_count
+        for page_no in range(first_page_no, last_page_no + 1):
+            yield page_no, self.page_text(page_no)
+
+    def release_page(self, page_no: int) -> None:
+        """
+        Drops the memoised text, layout and objects of a page (1-based), so a
+        single pass over the pages only keeps the ones in use. They are
+        computed again if the page is used later.
+        """
+        self._text_by_page.pop(page_no, None)
+        self.page(page_no).close()
+
+    def page_layout(self, page_no: int) -> Tuple[Any, Tuple[float, float]]:
+        """
+        Returns the pdfminer `LTPage` layout and the (width, height) of a page,
+        mirroring `camelot.utils.get_page_layout` without re-opening the file.
+        """
+        # pdfplumber memoises the layout on the page, and shares one resource
+        # manager across pages, so fonts are only decoded once per file
+        layout = self.page(page_no).layout
+        return layout, (layout.bbox[2], layout.bbox[3])
+
+    def page_dimensions(self, page_no: int = 1) -> Tuple[float, float]:
+        _layout, dim = self.page_layout(page_no)
+        return dim
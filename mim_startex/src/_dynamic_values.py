@@ -1,8 +1,10 @@
-from typing import Any, Dict, List, Optional
+from typing import List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from . import _barcodes
+from ._results import ResultBuilder
 
 
 def get_value(
@@ -24,9 +26,8 @@ def get_value(
 
 
 def extract_one_item(
-    data: Dict[str, List[Any]],
-    static_values: Dict[str, Any],
-    all_barcodes_df: pd.DataFrame,
+    results: ResultBuilder,
+    barcode_index: _barcodes.BarcodeIndex,
     item: pd.DataFrame,
     preferred_column_list: List[str],
     preffered_size_list: List[str],
@@ -34,31 +35,11 @@ def extract_one_item(
 ) -> None:
 
     for column in preffered_size_list:
-        # Inject the static values
-        data["Purchase Order"] = static_values["Purchase Order"]
-        data["Buying House"] = static_values["Buying House"]
-        data["Buying House Address"] = static_values["Buying House Address"]
-        data["Ship-to Address"] = static_values["Ship-to Address"]
-        data["Vendor No"] = static_values["Vendor No"]
-        data["Payment Terms"] = static_values["Payment Terms"]
-        data["Document Date"] = static_values["Document Date"]
-        data["Shipment Method"] = static_values["Shipment Method"]
-        data["Order Type"] = static_values["Order Type"]
-        data["Shipping Agent"] = static_values["Shipping Agent"]
-        data["Order for"] = static_values["Order for"]
-        data["Style No"] = static_values["Style No"]
-        data["Style Description"] = static_values["Style Description"]
-        data["HS Code"] = static_values["HS Code"]
-        data["Price Including VAT"] = static_values["Price Including VAT"]
-        data["Total Qty."] = static_values["Total Qty."]
-
         # Fetch dynamic values
         prepack_code = get_value(item, "Prepack Code", preferred_column_list)
-        data["Prepack Code"].append(prepack_code)
 
         prepacks = get_value(item, "Prepacks", preferred_column_list)
         prepacks = prepacks if prepacks != "" else "0"
-        data["Prepacks"].append(prepacks)
 
         color_name = get_value(
             item,
@@ -73,30 +54,185 @@ def extract_one_item(
         if color_name == "Greymelange":
             color_description = color_name
             color_name = "Grey Mélange"
-        data["Color Code"].append(color_description)
 
         size = column
-        data["Size"].append(size)
 
         prepack_qty = get_value(item, column, preferred_column_list)
         prepack_qty = prepack_qty if prepack_qty != "" else "0"
-        data["Prepack Qty"].append(prepack_qty)
 
         qty = int(prepacks) * int(prepack_qty)
-        data["Qty"].append(qty)
 
         total_qty = get_value(item, "Qty", preferred_column_list)
         total_qty = total_qty.replace(".", "")
-        data["Style Qty"].append(total_qty)
 
         # fetch and add barcode
         #   Handle Exception for color name 'Greymelange'
         if color_name == "Grey Mélange":
-            barcode_value = _barcodes.get_barcode(
-                all_barcodes_df, f"{color_name}", size
-            )
+            barcode_value = _barcodes.get_barcode(barcode_index, f"{color_name}", size)
         else:
             barcode_value = _barcodes.get_barcode(
-                all_barcodes_df, f"{color_code} {color_name}", size
+                barcode_index, f"{color_code} {color_name}", size
             )
-        data["Barcode"].append(barcode_value)
+
+        results.append(
+            {
+                "Prepack Code": prepack_code,
+                "Prepacks": prepacks,
+                "Color Code": color_description,
+                "Size": size,
+                "Prepack Qty": prepack_qty,
+                "Qty": qty,
+                "Style Qty": total_qty,
+                "Barcode": barcode_value,
+            }
+        )
+
+
+def get_values(
+    values: np.ndarray,
+    rows: np.ndarray,
+    param: str,
+    preferred_columns_list: List[str],
+    cols: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Vectorised `get_value`: returns the stripped cells of `param`'s column (or
+    of `cols`) at `rows`. A column missing from `preferred_columns_list` gives ''.
+    """
+    if cols is None:
+        if param not in preferred_columns_list:
+            print(f"Error: Couldn't find the column ({param}) and used '' for it.")
+            return np.full(len(rows), "", dtype=str)
+        cols = preferred_columns_list.index(param)
+    return np.char.strip(values[rows, cols].astype(str))
+
+
+def melt_items(
+    split: pd.DataFrame,
+    items: List[Tuple[int, int, Optional[int]]],
+    preferred_column_list: List[str],
+    preffered_size_list: List[str],
+) -> pd.DataFrame:
+    """
+    Reshapes the colour items of a split into a long-format frame with one row
+    per (item, size), in item-major order (same order `extract_one_item` uses).
+
+    The size cells of all items are taken at once as an (items x sizes) block
+    and melted, and Qty is computed as Prepacks x Prepack Qty over the column.
+
+    Args:
+        split: The split, after `split_combined_columns_df`.
+        items: (first row, last row, color name column) of each colour item.
+               A color name column of None means the 'Color Code' column.
+        preferred_column_list: The cleaned column names of the split.
+        preffered_size_list: The size columns to melt over.
+
+    Returns:
+        A frame with the dynamic value columns (but 'Barcode') and the
+        'Barcode Color' to look the barcode up by.
+
+    Raises:
+        IndexError, ValueError: If the split doesn't fit the expected layout.
+    """
+    values = split.to_numpy(dtype=object)
+    first_rows = np.array([first for first, _last, _col in items], dtype=int)
+    last_rows = np.array([last for _first, last, _col in items], dtype=int)
+
+    color_code_col = preferred_column_list.index("Color Code")
+    color_name_cols = np.array(
+        [color_code_col if col is None else col for _first, _last, col in items],
+        dtype=int,
+    )
+    size_cols = [preferred_column_list.index(size) for size in preffered_size_list]
+    size_count = len(preffered_size_list)
+
+    prepack_code = get_values(values, first_rows, "Prepack Code", preferred_column_list)
+
+    prepacks = get_values(values, first_rows, "Prepacks", preferred_column_list)
+    prepacks = np.where(prepacks == "", "0", prepacks)
+
+    color_name = get_values(
+        values, last_rows, "Color Code", preferred_column_list, color_name_cols
+    )
+    color_code = get_values(values, first_rows, "Color Code", preferred_column_list)
+    # Handle Exception for color name 'Greymelange'
+    is_greymelange = color_name == "Greymelange"
+    color_description = np.where(
+        is_greymelange,
+        color_name,
+        np.char.add(np.char.add(color_code, " "), color_name),
+    )
+    barcode_color = np.where(is_greymelange, "Grey Mélange", color_description)
+
+    style_qty = get_values(values, first_rows, "Qty", preferred_column_list)
+    style_qty = np.char.replace(style_qty, ".", "")
+
+    # Melt the (items x sizes) block of prepack quantities
+    prepack_qty = np.char.strip(values[np.ix_(first_rows, size_cols)].astype(str))
+    prepack_qty = np.where(prepack_qty == "", "0", prepack_qty).ravel()
+
+    qty = np.repeat(prepacks.astype(np.int64), size_count) * prepack_qty.astype(
+        np.int64
+    )
+
+    return pd.DataFrame(
+        {
+            "Prepack Code": np.repeat(prepack_code, size_count),
+            "Prepacks": np.repeat(prepacks, size_count),
+            "Color Code": np.repeat(color_description, size_count),
+            "Size": np.tile(np.array(preffered_size_list, dtype=str), len(items)),
+            "Prepack Qty": prepack_qty,
+            "Qty": qty,
+            "Style Qty": np.repeat(style_qty, size_count),
+            "Barcode Color": np.repeat(barcode_color, size_count),
+        }
+    )
+
+
+def extract_items(
+    results: ResultBuilder,
+    barcode_index: _barcodes.BarcodeIndex,
+    split: pd.DataFrame,
+    items: List[Tuple[int, int, Optional[int]]],
+    preferred_column_list: List[str],
+    preffered_size_list: List[str],
+) -> None:
+    """
+    Extracts every colour item of a split into `results` through `melt_items`.
+
+    Falls back to `extract_one_item` per item if the split doesn't fit the
+    vectorised path.
+    """
+    if not items:
+        return
+
+    try:
+        items_df = melt_items(split, items, preferred_column_list, preffered_size_list)
+    except (IndexError, ValueError):
+        for first, last, color_name_index in items:
+            extract_one_item(
+                results,
+                barcode_index,
+                split[first : last + 1],
+                preferred_column_list,
+                preffered_size_list,
+                color_name_index,
+            )
+        return
+
+    barcodes = [
+        _barcodes.get_barcode(barcode_index, color, size)
+        for color, size in zip(items_df["Barcode Color"], items_df["Size"])
+    ]
+    results.extend(
+        {
+            "Prepack Code": items_df["Prepack Code"].to_numpy(),
+            "Prepacks": items_df["Prepacks"].to_numpy(),
+            "Color Code": items_df["Color Code"].to_numpy(),
+            "Size": items_df["Size"].to_numpy(),
+            "Prepack Qty": items_df["Prepack Qty"].to_numpy(),
+            "Qty": items_df["Qty"].to_numpy(),
+            "Style Qty": items_df["Style Qty"].to_numpy(),
+            "Barcode": barcodes,
+        }
+    )
@@ -1,59 +1,100 @@
-from typing import Any, Dict, List, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
-import camelot
+import numpy as np
 import pandas as pd
-from camelot import utils
 from tqdm import tqdm
 
-from . import _barcodes, _dynamic_values, _static_values
+from . import (
+    _backends,
+    _barcodes,
+    _dynamic_values,
+    _static_values,
+    _tables,
+    _templates,
+)
+from ._cache import PageTableCache
+from ._document import PdfDocument
+from ._results import ExcelChunkWriter, ResultBuilder
 
 
-def split_dataframe_by_value_and_truncate(
+def find_split_ranges(
     df: pd.DataFrame,
     split_column_name: Union[str, int],
     split_value: str,
     end_marker_value: str,
-) -> List[pd.DataFrame]:
+    marker_columns: Optional[List[Union[str, int]]] = None,
+) -> List[Tuple[int, int]]:
     """
-    Splits a DataFrame into smaller DataFrames, where each split starts
-    with a row containing the specified 'split_value' in 'split_column_name'.
-
-    Each resulting split is then truncated to end *before* the first row
-    that contains the 'end_marker_value' in *any* column. Rows before the
-    very first instance of the split_value are also removed.
+    Returns the (start, stop) row positions of each split of a DataFrame, as
+    `split_dataframe_by_value_and_truncate()` splits it.
+
+    The split rows and the end marker rows are each found in one pass over
+    the frame's column arrays, and each split stops at the first end marker
+    row at or after its start (or at the next split). The end marker is only
+    searched for in `marker_columns`, which defaults to every column that can
+    hold text (a numeric column never equals it).
     """
+    row_count = len(df)
+    if row_count == 0:
+        return []
+
+    is_split_point = df[split_column_name].eq(split_value).to_numpy(dtype=bool)
+
+    if marker_columns is None:
+        marker_positions = [
+            position
+            for position, dtype in enumerate(df.dtypes)
+            if pd.api.types.is_string_dtype(dtype)
+        ]
+    else:
+        marker_positions = list(df.columns.get_indexer(marker_columns))
+    is_end_marker = np.zeros(row_count, dtype=bool)
+    for position in marker_positions:
+        is_end_marker |= df.iloc[:, position].to_numpy() == end_marker_value
 
-    # 1. Find the index of the first occurrence of the split_value
-    first_split_index = df[split_column_name].eq(split_value).idxmax()
-
-    # 2. Slice the DataFrame to start from this first split point
-    df_sliced = df.loc[first_split_index:].copy()
-
-    # 3. Create a boolean Series for the splitting points (on the sliced DataFrame)
-    is_split_point = df_sliced[split_column_name] == split_value
-
-    # 4. Use cumsum() to create a unique group ID for each segment
-    group_ids = is_split_point.cumsum()
-
-    # 5. Group and Truncate the parts
-    split_dfs = []
+    # Rows before the first split are left out, unless there is no split at all
+    starts = np.flatnonzero(is_split_point)
+    if len(starts) == 0:
+        starts = np.zeros(1, dtype=np.intp)
+    split_stops = np.append(starts[1:], row_count)
 
-    for _group_id, group_df in df_sliced.groupby(group_ids):
-        is_end_marker = (group_df == end_marker_value).any(axis=1)
+    marker_rows = np.append(np.flatnonzero(is_end_marker), row_count)
+    marker_stops = marker_rows[np.searchsorted(marker_rows, starts)]
 
-        if is_end_marker.any():
-            first_marker_row_index = is_end_marker.idxmax()
+    stops = np.minimum(split_stops, marker_stops)
+    return [
+        (int(start), int(stop)) for start, stop in zip(starts, stops) if stop > start
+    ]
 
-            marker_position = group_df.index.get_loc(first_marker_row_index)
 
-            truncated_df = group_df.iloc[:marker_position]
+def split_dataframe_by_value_and_truncate(
+    df: pd.DataFrame,
+    split_column_name: Union[str, int],
+    split_value: str,
+    end_marker_value: str,
+    marker_columns: Optional[List[Union[str, int]]] = None,
+) -> List[pd.DataFrame]:
+    """
+    Splits a DataFrame into smaller DataFrames, where each split starts
+    with a row containing the specified 'split_value' in 'split_column_name'.
 
-            if not truncated_df.empty:
-                split_dfs.append(truncated_df)
-        else:
-            split_dfs.append(group_df)
+    Each resulting split is then truncated to end *before* the first row
+    that contains the 'end_marker_value' in *any* column (or in
+    'marker_columns', if given). Rows before the very first instance of the
+    split_value are also removed.
 
-    return split_dfs
+    The splits are positional slices of `df` (see `find_split_ranges()`),
+    not copies, and keep its index labels.
+    """
+    return [
+        df.iloc[start:stop]
+        for start, stop in find_split_ranges(
+            df, split_column_name, split_value, end_marker_value, marker_columns
+        )
+    ]
 
 
 def split_combined_columns_df(df: pd.DataFrame, char: str) -> pd.DataFrame:
@@ -61,9 +102,14 @@ def split_combined_columns_df(df: pd.DataFrame, char: str) -> pd.DataFrame:
     Splits cells containing a specified character (e.g., newline '\n') across multiple
     new columns, fixing column misalignment typical in table extraction.
 
-    Iterates through the DataFrame columns. If any cell in a column contains the
-    `char` delimiter, the cell's content is split, and the resulting parts are
-    injected as new columns immediately to the right, shifting subsequent columns.
+    If any cell in a column contains the `char` delimiter, every text cell of
+    the column is split on it, and the parts are injected as new columns
+    immediately to the right, shifting subsequent columns. The column is
+    widened to its cell with the most parts.
+
+    The delimiter-bearing cells and each column's width are found in one
+    pass over the whole frame, and the realigned frame is filled into a
+    single array.
 
     Args:
         df (pd.DataFrame): The input DataFrame, typically from table extraction.
@@ -73,49 +119,46 @@ def split_combined_columns_df(df: pd.DataFrame, char: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: A new DataFrame with split columns and aligned data.
                       NaN values resulting from the split are converted to "".
+                      Non-text cells of a split column are converted to "".
     """
     if not char:
         print("Error: Delimiter character (char) cannot be None.")
         return df
 
-    new_data = {}
-    col_offset = 0
-
-    for col in df.columns:
-        current_series = df[col]
-
-        if current_series.astype(str).str.contains(char, regex=False).any():
-
-            # 1. Split the column data. `expand=True` creates a temporary DataFrame
-            split_data = current_series.str.split(char, expand=True)
-            split_data = split_data.fillna("")
-
-            # 2. Add the first part (the 'head') to the new DataFrame structure
-            new_col_key = col + col_offset
-            new_data[new_col_key] = split_data[0]
-
-            # 3. Add the remaining split parts as new columns (injected beside)
-            for i in range(1, split_data.shape[1]):
-                col_offset += 1  # Increment offset for the new injected column
-                injected_col_key = col + col_offset
-                new_data[injected_col_key] = split_data[i]
-
-        else:
-            new_col_key = col + col_offset
-            new_data[new_col_key] = current_series.fillna("")
+    values = df.to_numpy(dtype=object)
+    texts = values.astype(str)
+
+    # No. of parts of each cell, and the width each column expands to
+    part_counts = np.strings.count(texts, char) + 1
+    is_text = texts.astype(object) == values
+    widths = np.where(is_text, part_counts, 1).max(axis=0, initial=1)
+    positions = np.concatenate(([0], np.cumsum(widths)[:-1]))
+
+    new_values = np.full((len(df), int(widths.sum())), "", dtype=object)
+    for col, (width, position) in enumerate(zip(widths, positions)):
+        if width == 1:
+            column_values = values[:, col]
+            new_values[:, position] = np.where(
+                pd.isna(column_values), "", column_values
+            )
+            continue
 
-    new_df = pd.DataFrame(new_data)
-    new_df.columns = range(new_df.shape[1])
+        # Non-text cells have no parts, so they are left as "" in all of them
+        rest = np.where(is_text[:, col], texts[:, col], "")
+        for part_no in range(width - 1):
+            new_values[:, position + part_no], _sep, rest = np.strings.partition(
+                rest, char
+            )
+        new_values[:, position + width - 1] = rest
 
-    return new_df
+    return pd.DataFrame(new_values, index=df.index, columns=range(new_values.shape[1]))
 
 
 def extract_one_split(
     split: pd.DataFrame,
     is_without_prepacks: bool,
-    data: Dict[str, List[Any]],
-    static_values: Dict[str, Any],
-    all_barcodes_df: pd.DataFrame,
+    results: ResultBuilder,
+    barcode_index: _barcodes.BarcodeIndex,
 ) -> None:
     # Handle 'combined columns irregularity' for 'without prepacks' files
     split = split_combined_columns_df(split, "\n")
@@ -166,67 +209,59 @@ def extract_one_split(
         column_list[-2] = "Prepacks"
         column_list[-3] = "Prepack Code"
 
+    # Find the (first row, last row, color name column) of each colour item
+    items = []
     for i in range(2, len(split), 2):
         color_name1 = split.iloc[i, color_code1_index]
 
         if color_name1 != "":
             # Handle Exception if color name is 'Greymelange'
             if color_name1 == "Greymelange":
-                item = split[i : i + 1]
-                _dynamic_values.extract_one_item(
-                    data, static_values, all_barcodes_df, item, column_list, size_list
-                )
+                items.append((i, i, None))
 
                 if i + 1 < len(split):
-                    item = split[i + 1 : i + 2]
-                    _dynamic_values.extract_one_item(
-                        data,
-                        static_values,
-                        all_barcodes_df,
-                        item,
-                        column_list,
-                        size_list,
-                        color_code2_index,
-                    )
+                    items.append((i + 1, i + 1, color_code2_index))
             else:
-                item = split[i : i + 2]
-                _dynamic_values.extract_one_item(
-                    data,
-                    static_values,
-                    all_barcodes_df,
-                    item,
-                    column_list,
-                    size_list,
-                    color_code2_index,
-                )
+                items.append((i, min(i + 1, len(split) - 1), color_code2_index))
+
+    _dynamic_values.extract_items(
+        results, barcode_index, split, items, column_list, size_list
+    )
 
 
 def extract_page(
     page_number: int,
-    file_name: str,
+    document: PdfDocument,
+    page_table: Optional[pd.DataFrame],
     split_to_join: Optional[pd.DataFrame],
     static_values: Dict[str, Any],
-    all_barcodes_df: pd.DataFrame,
+    barcode_index: _barcodes.BarcodeIndex,
     is_without_prepacks: bool,
-    data: Dict[str, List[Any]],
-) -> None:
-    _layout, dim = utils.get_page_layout(file_name)
-
-    width = dim[0]
-    height = dim[1]
-    header_offset = 350 if split_to_join is None else 300
-    table_coords = [f"0,{height-header_offset},{width}, 0"]
-
-    tables = camelot.read_pdf(
-        filepath=file_name,
-        pages=str(page_number),
-        flavor="stream",
-        table_areas=table_coords,
-    )
-
-    if tables.n > 0:
-        df = tables[-1].df
+    results: ResultBuilder,
+    table_cache: Optional[PageTableCache] = None,
+    continuation_table_areas: Optional[List[str]] = None,
+    backend: Optional[_backends.TableBackend] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Extracts every complete style split on a page into `results`.
+    `page_table` is the page's table read with the order lines table areas.
 
+    Returns the trailing one-row style split, if the page ends with one, so
+    the caller can join it with the next page. Otherwise returns None.
+    """
+    if split_to_join is None:
+        df = page_table
+    else:
+        # The pre-read tables skip the full page header, so re-read this page
+        # with the smaller continuation header offset
+        table_coords = continuation_table_areas
+        if table_coords is None:
+            table_coords = _tables.get_table_areas(document, header_offset=300)
+        df = _tables.read_page_tables(
+            document, {page_number: table_coords}, table_cache, backend=backend
+        )[page_number]
+
+    if df is not None:
         if split_to_join is not None:
             df_cols = set(df.columns)
             split_to_join_cols = set(split_to_join.columns)
@@ -235,6 +270,7 @@ def extract_page(
             split_to_join_cleaned = split_to_join.drop(columns=columns_to_drop)
 
             df = pd.concat([split_to_join_cleaned, df], ignore_index=True)
+            split_to_join = None
 
         split_column_no = 0
         split_value = str(static_values["Style No"])
@@ -247,94 +283,241 @@ def extract_page(
             if split[0].isin([static_values["Style No"]]).any():
                 if len(split) > 1:
                     extract_one_split(
-                        split, is_without_prepacks, data, static_values, all_barcodes_df
+                        split, is_without_prepacks, results, barcode_index
                     )
+                    split_to_join = None
                 else:
                     split_to_join = split
 
     else:
         print("No table found in the specified area.")
 
+    return split_to_join
 
-def main(file_name: str) -> None:
-    data = {
-        # Static Values
-        "Purchase Order": [],
-        "Buying House": [],
-        "Buying House Address": [],
-        "Ship-to Address": [],
-        "Vendor No": [],
-        "Payment Terms": [],
-        "Document Date": [],
-        "Shipment Method": [],
-        "Order Type": [],
-        "Shipping Agent": [],
-        "Order for": [],
-        "Style No": [],
-        "Style Description": [],
-        "HS Code": [],
-        "Price Including VAT": [],
-        # Dynamic Values
-        "Prepack Code": [],
-        "Prepacks": [],
-        "Color Code": [],
-        "Size": [],
-        "Prepack Qty": [],
-        "Qty": [],
-        "Style Qty": [],
-        "Barcode": [],
-        "Total Qty.": [],
-    }
-
-    # -----------------------------
-    # Fetch the static values first
-    total_page_no, barcode_starting_page_no, contains_ASS, static_values = (
-        _static_values.get_static_values(file_name, target_page_no=1)
-    )
-    is_without_prepacks = not contains_ASS
 
-    print("-------------------")
-    if is_without_prepacks:
-        print("Without Prepacks")
-        print(static_values)
-    else:
-        print("With Prepacks")
-    print("-------------------")
-    # -----------------------------
+# Bump whenever a change alters the extracted rows, so cached outputs of
+# older versions are not reused
+EXTRACTOR_VERSION = "1"
 
-    # -----------------------------
-    # Fetch all barcodes in dataframe for later query
-    all_barcodes_df = _barcodes.get_all_barcodes_df(
-        file_name, barcode_starting_page_no, total_page_no
-    )
-    # -----------------------------
-
-    # If split found, then join it with the next one
-    split_to_join = None
-
-    if total_page_no is not None and barcode_starting_page_no is not None:
-        print("Extracting dynamic values:")
-        print("==========================")
-        for page_no in tqdm(range(1, barcode_starting_page_no)):
-            extract_page(
-                page_no,
-                file_name,
-                split_to_join,
-                static_values,
-                all_barcodes_df,
-                is_without_prepacks,
-                data,
+# Pages read per page worker at a time when streaming
+STREAM_WINDOW_PAGES = 8
+
+
+def extract(
+    file_name: str,
+    page_workers: int = 1,
+    table_cache: Optional[PageTableCache] = None,
+    writer: Optional[ExcelChunkWriter] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Extracts every row of a PO PDF into a DataFrame.
+
+    With a `writer`, the PO is streamed instead: the pages are read and
+    extracted one at a time (a window of `STREAM_WINDOW_PAGES` per page
+    worker in parallel), each page is released once extracted, and the rows
+    are written out every `writer.chunk_rows` rows. Only the barcode index
+    and a style split cut by a page break are kept across pages, so memory
+    stays flat however many pages the PO has. The page workers are started
+    once for the PO and read the windows of both the barcode and the order
+    line pages.
+
+    Args:
+        file_name: The PDF file to extract.
+        page_workers: No. of worker processes reading the page tables.
+        table_cache: The persistent page table cache to replay tables from.
+        writer: The output to stream the rows to.
+
+    Returns:
+        The rows, or None if they were streamed to `writer`.
+    """
+    results = ResultBuilder()
+    stream = writer is not None
+    window_pages = page_workers * STREAM_WINDOW_PAGES if stream else None
+
+    with ExitStack() as stack:
+        document = stack.enter_context(PdfDocument(file_name, keep_layouts=not stream))
+        executor = None
+        if stream and page_workers > 1:
+            executor = stack.enter_context(
+                ProcessPoolExecutor(max_workers=page_workers)
+            )
+
+        # Identify the PO layout (and its table areas) from the first page
+        template, table_areas = _templates.detect_layout(document)
+
+        # -----------------------------
+        # Fetch the static values first
+        total_page_no, barcode_starting_page_no, contains_ASS, static_values = (
+            _static_values.get_static_values(document, target_page_no=1)
+        )
+        is_without_prepacks = not contains_ASS
+        results.set_static_values(static_values)
+
+        print("-------------------")
+        print(f"{template.name} PO")
+        if is_without_prepacks:
+            print("Without Prepacks")
+            print(static_values)
+        else:
+            print("With Prepacks")
+        print("-------------------")
+        # -----------------------------
+
+        # Pick the fastest table backend that reads this template correctly
+        order_lines_backend = _backends.select_backend(
+            template.name, "order lines", document, 1, table_areas.order_lines
+        )
+        barcodes_backend = None
+        if barcode_starting_page_no is not None:
+            barcodes_backend = _backends.select_backend(
+                template.name,
+                "barcode",
+                document,
+                barcode_starting_page_no,
+                table_areas.barcodes,
+                is_valid=partial(
+                    _barcodes.barcode_tables_equal,
+                    page_number=barcode_starting_page_no,
+                    barcode_starting_page_no=barcode_starting_page_no,
+                ),
             )
 
+        # -----------------------------
+        # Index all barcodes for later query
+        barcode_index = _barcodes.get_barcode_index(
+            document,
+            barcode_starting_page_no,
+            total_page_no,
+            workers=page_workers,
+            table_cache=table_cache,
+            table_areas=table_areas.barcodes,
+            backend=barcodes_backend,
+            window_pages=window_pages,
+            executor=executor,
+        )
+        # -----------------------------
+
+        # If split found, then join it with the next one
+        split_to_join = None
+
+        if total_page_no is not None and barcode_starting_page_no is not None:
+            print("Extracting dynamic values:")
+            print("==========================")
+            page_numbers = range(1, barcode_starting_page_no)
+            table_areas_by_page = {
+                page_no: table_areas.order_lines for page_no in page_numbers
+            }
+            page_tables: Iterable[Tuple[int, Optional[pd.DataFrame]]]
+            if stream and page_workers > 1:
+                page_tables = _tables.iter_page_tables_parallel(
+                    document,
+                    table_areas_by_page,
+                    page_workers,
+                    window_pages,
+                    table_cache,
+                    backend=order_lines_backend,
+                    executor=executor,
+                )
+            elif stream:
+                page_tables = _tables.iter_page_tables(
+                    document,
+                    table_areas_by_page,
+                    table_cache,
+                    backend=order_lines_backend,
+                )
+            # Phase 1: read the table of every page up front (in parallel
+            # with `page_workers` > 1)
+            elif page_workers > 1:
+                page_tables = sorted(
+                    _tables.read_page_tables_parallel(
+                        document,
+                        table_areas_by_page,
+                        page_workers,
+                        table_cache,
+                        backend=order_lines_backend,
+                    ).items()
+                )
+            else:
+                page_tables = _tables.read_page_tables(
+                    document,
+                    table_areas_by_page,
+                    table_cache,
+                    backend=order_lines_backend,
+                ).items()
+
+            # Phase 2: walk the pages in order, joining a style split cut by a
+            # page break onto the next page
+            for page_no, page_table in tqdm(page_tables, total=len(page_numbers)):
+                split_to_join = extract_page(
+                    page_no,
+                    document,
+                    page_table,
+                    split_to_join,
+                    static_values,
+                    barcode_index,
+                    is_without_prepacks,
+                    results,
+                    table_cache,
+                    table_areas.continuation,
+                    order_lines_backend,
+                )
+                if stream:
+                    document.release_page(page_no)
+                    if len(results) >= writer.chunk_rows:
+                        writer.write(results.pop_dataframe())
+
+        barcode_index.report()
+        order_lines_backend.report()
+        if barcodes_backend is not None:
+            barcodes_backend.report()
+
     print("-------------------")
     print("Extraction Complete!")
     print("-------------------")
-    df = pd.DataFrame(data)
+    if stream:
+        writer.write(results.pop_dataframe())
+        return None
+    return results.to_dataframe()
+
+
+def output_file_name(file_name: str) -> str:
+    """
+    Returns the output file name of a PO PDF, '<pdf name>.xlsx'.
+    """
+    return f"{file_name.split("/")[-1].split("\\")[-1].split(".pdf")[0]}.xlsx"
+
+
+def save_output(df: pd.DataFrame, file_name: str) -> None:
+    """
+    Saves the extracted rows of a PO PDF as '<pdf name>.xlsx' in the base
+    directory.
+    """
     try:
-        out_file_name = (
-            f"{file_name.split("/")[-1].split("\\")[-1].split(".pdf")[0]}.xlsx"
-        )
+        out_file_name = output_file_name(file_name)
         df.to_excel(out_file_name, index=False)
         print(f"Saved as {out_file_name} in the base directory!")
     except:
         print("Couldn't save output.xlsx!")
+
+
+def main(
+    file_name: str,
+    page_workers: int = 1,
+    table_cache: Optional[PageTableCache] = None,
+    stream: bool = False,
+) -> Optional[pd.DataFrame]:
+    """
+    Extracts a PO PDF and saves its rows as '<pdf name>.xlsx'. With `stream`,
+    the rows are written out in chunks as they're extracted (see `extract`)
+    and None is returned.
+    """
+    if not stream:
+        df = extract(file_name, page_workers, table_cache)
+        save_output(df, file_name)
+        return df
+
+    out_file_name = output_file_name(file_name)
+    with ExcelChunkWriter(out_file_name) as writer:
+        extract(file_name, page_workers, table_cache, writer)
+    print(f"Saved {writer.row_count} rows as {out_file_name} in the base directory!")
+    return None
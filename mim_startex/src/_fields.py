@@ -0,0 +1,108 @@
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class Field(NamedTuple):
+    """
+    A text field found between two keyphrases.
+
+    The value is the text after the first `left` keyphrase (up to the next
+    `left`, if repeated), cut before the first `right` keyphrase and stripped,
+    the same as `get_value_between_keyphrases(text, left, right)`.
+
+    Args:
+        name: The key the value is returned under.
+        left: The keyphrase the value follows.
+        right: The keyphrase the value ends at. The value runs to the end of
+               the segment if it's missing.
+        transform: Applied to the value once found, if given.
+    """
+
+    name: str
+    left: str
+    right: str = "\n"
+    transform: Optional[Callable[[str], str]] = None
+
+
+def find_between(text: str, left: str, right: str) -> Optional[str]:
+    """
+    Returns the value between `left` and `right` (see `Field`), or None if
+    `left` is not in `text` or either keyphrase is empty.
+
+    Works on offsets into `text`, so only the value itself is copied, not
+    the rest of the page after `left`.
+    """
+    if not left or not right:
+        return None
+
+    start = text.find(left)
+    if start < 0:
+        return None
+    start += len(left)
+
+    end = text.find(left, start)
+    if end < 0:
+        end = len(text)
+
+    # Bounds of the segment once stripped, `right` is searched within them
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+
+    cut = text.find(right, start, end)
+    if cut >= 0:
+        end = cut
+    return text[start:end].strip()
+
+
+class FieldScanner:
+    """
+    Extracts a declared set of fields from page texts.
+
+    Usage:
+        scanner = FieldScanner([Field("Order Type", "Order Type", "Shipping Agent")])
+        values, missing = scanner.scan(text)
+
+    Args:
+        fields: The fields to extract. Names must be unique.
+    """
+
+    def __init__(self, fields: Iterable[Field]) -> None:
+        self.fields = tuple(fields)
+        names = [field.name for field in self.fields]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate field names in {names}!")
+
+    def scan(self, text: str) -> Tuple[Dict[str, Optional[str]], List[str]]:
+        """
+        Returns the value of every field (None if not found) and the names of
+        the fields that were not found.
+        """
+        return self.scan_pages([text])
+
+    def scan_pages(
+        self, pages: Iterable[str]
+    ) -> Tuple[Dict[str, Optional[str]], List[str]]:
+        """
+        Same as `scan`, but over several pages. Each field takes its value
+        from the first page it's found on, and the pages stop being consumed
+        once every field has been found.
+        """
+        values: Dict[str, Optional[str]] = {field.name: None for field in self.fields}
+        remaining = list(self.fields)
+
+        for text in pages:
+            still_missing = []
+            for field in remaining:
+                value = find_between(text, field.left, field.right)
+                if value is None:
+                    still_missing.append(field)
+                    continue
+                if field.transform is not None:
+                    value = field.transform(value)
+                values[field.name] = value
+            remaining = still_missing
+            if not remaining:
+                break
+
+        return values, [field.name for field in remaining]
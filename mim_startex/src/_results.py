@@ -0,0 +1,220 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+# Output columns, in order
+STATIC_KEYS = [
+    "Purchase Order",
+    "Buying House",
+    "Buying House Address",
+    "Ship-to Address",
+    "Vendor No",
+    "Payment Terms",
+    "Document Date",
+    "Shipment Method",
+    "Order Type",
+    "Shipping Agent",
+    "Order for",
+    "Style No",
+    "Style Description",
+    "HS Code",
+    "Price Including VAT",
+]
+DYNAMIC_KEYS = [
+    "Prepack Code",
+    "Prepacks",
+    "Color Code",
+    "Size",
+    "Prepack Qty",
+    "Qty",
+    "Style Qty",
+    "Barcode",
+]
+COLUMNS = STATIC_KEYS + DYNAMIC_KEYS + ["Total Qty."]
+
+# No. of rows a streaming extraction gathers before writing them out
+DEFAULT_CHUNK_ROWS = 10_000
+
+# Dynamic columns with few distinct values, stored as categoricals
+CATEGORICAL_KEYS = [
+    "Prepack Code",
+    "Prepacks",
+    "Color Code",
+    "Size",
+    "Prepack Qty",
+    "Style Qty",
+]
+
+
+def column_dtype(key: str) -> Any:
+    return np.int64 if key == "Qty" else object
+
+
+def broadcast_value(value: Optional[Any], row_count: int, categorical: bool) -> Any:
+    """
+    Repeats a static value `row_count` times, as a single category
+    categorical (a missing value becomes NaN) or as a plain object array.
+    """
+    if not categorical:
+        return np.full(row_count, value, dtype=object)
+    if value is None:
+        return pd.Categorical.from_codes(
+            np.full(row_count, -1, dtype=np.int8),
+            categories=pd.Index([], dtype=object),
+        )
+    return pd.Categorical.from_codes(
+        np.zeros(row_count, dtype=np.int8), categories=pd.Index([value], dtype=object)
+    )
+
+
+class ResultBuilder:
+    """
+    Accumulates the extracted rows of one PO column by column.
+
+    The static PO header is stored once and only broadcast when the frame is
+    built. The dynamic values are kept as a list of array chunks per column,
+    appended a whole split at a time with `extend()` (or a row at a time with
+    `append()`), and concatenated once in `to_dataframe()`.
+
+    Usage:
+        results = ResultBuilder()
+        results.set_static_values(static_values)
+        results.extend({"Prepack Code": [...], ...})
+        df = results.to_dataframe()
+    """
+
+    def __init__(self) -> None:
+        self.static_values: Dict[str, Any] = {}
+        self._chunks: Dict[str, List[np.ndarray]] = {key: [] for key in DYNAMIC_KEYS}
+        self._pending_rows: Dict[str, List[Any]] = {key: [] for key in DYNAMIC_KEYS}
+        self._row_count = 0
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def set_static_values(self, static_values: Dict[str, Any]) -> None:
+        self.static_values = static_values
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """
+        Appends a single row of dynamic values.
+        """
+        for key in DYNAMIC_KEYS:
+            self._pending_rows[key].append(row[key])
+        self._row_count += 1
+
+    def extend(self, columns: Dict[str, Any]) -> None:
+        """
+        Appends a block of rows, given as one equal-length sequence per
+        dynamic value.
+        """
+        self._flush_pending_rows()
+
+        row_count = len(columns[DYNAMIC_KEYS[0]])
+        for key in DYNAMIC_KEYS:
+            chunk = np.asarray(columns[key], dtype=column_dtype(key))
+            if len(chunk) != row_count:
+                raise ValueError(
+                    f"Column ({key}) has {len(chunk)} values, expected {row_count}!"
+                )
+            self._chunks[key].append(chunk)
+        self._row_count += row_count
+
+    def _flush_pending_rows(self) -> None:
+        if not self._pending_rows[DYNAMIC_KEYS[0]]:
+            return
+        for key in DYNAMIC_KEYS:
+            rows = self._pending_rows[key]
+            self._chunks[key].append(np.asarray(rows, dtype=column_dtype(key)))
+            self._pending_rows[key] = []
+
+    def _column(self, key: str) -> np.ndarray:
+        chunks = self._chunks[key]
+        if not chunks:
+            return np.array([], dtype=column_dtype(key))
+        return np.concatenate(chunks)
+
+    def to_dataframe(self, categorical: bool = True) -> pd.DataFrame:
+        """
+        Builds the output frame, with the static values broadcast to every row.
+
+        Args:
+            categorical: Whether to store the repeated string columns (and the
+                         static values) as categoricals.
+        """
+        self._flush_pending_rows()
+
+        columns: Dict[str, Any] = {}
+        for key in COLUMNS:
+            if key in self._chunks:
+                values = self._column(key)
+                if categorical and key in CATEGORICAL_KEYS:
+                    values = pd.Categorical(values)
+            else:
+                values = broadcast_value(
+                    self.static_values.get(key), self._row_count, categorical
+                )
+            columns[key] = values
+
+        return pd.DataFrame(columns, columns=COLUMNS)
+
+    def pop_dataframe(self, categorical: bool = True) -> pd.DataFrame:
+        """
+        Same as `to_dataframe()`, but also clears the rows (the static values
+        are kept), so the rows can be handed out a chunk at a time.
+        """
+        df = self.to_dataframe(categorical)
+        self._chunks = {key: [] for key in DYNAMIC_KEYS}
+        self._row_count = 0
+        return df
+
+
+class ExcelChunkWriter:
+    """
+    Writes the output .xlsx a chunk of rows at a time.
+
+    openpyxl's write-only mode streams each row out as it's appended instead
+    of keeping the sheet in memory. The file reads back the same as
+    `df.to_excel(file_name, index=False)` of all the chunks concatenated.
+    The file is only saved if the `with` block completes.
+
+    Args:
+        file_name: Path of the .xlsx file to write.
+        columns: The header row.
+        chunk_rows: No. of rows a caller should gather before each `write()`.
+
+    Usage:
+        with ExcelChunkWriter(file_name) as writer:
+            writer.write(df)
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        columns: List[str] = COLUMNS,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> None:
+        self.file_name = file_name
+        self.chunk_rows = chunk_rows
+        self.row_count = 0
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Sheet1")
+        self._sheet.append(list(columns))
+
+    def __enter__(self) -> "ExcelChunkWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self._workbook.save(self.file_name)
+        else:
+            # Only finishes the sheet's temporary file, nothing is saved
+            self._sheet.close()
+
+    def write(self, df: pd.DataFrame) -> None:
+        # Missing values are left as empty cells, as `to_excel` does
+        for row in df.itertuples(index=False, name=None):
+            self._sheet.append([None if pd.isna(value) else value for value in row])
+        self.row_count += len(df)
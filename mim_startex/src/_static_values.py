@@ -1,42 +1,30 @@
 from typing import Any, Dict, List, Optional, Tuple
 
-import pdfplumber
+from ._document import PdfDocument
+from ._fields import Field, FieldScanner, find_between
 
 
 def read_pdf(
-    pdf_path: str, page_no_list: Optional[List[int]] = None
+    document: PdfDocument, page_no_list: Optional[List[int]] = None
 ) -> Optional[List[str]]:
     """
-    Extracts all text from specified page numbers of a PDF file.
+    Extracts all text from specified page numbers of an open PDF document.
     By default (if page_no_list is None), it extracts text from all pages.
 
     Args:
-        pdf_path: A string containing the filepath.
+        document: The open PDF document session.
         page_no_list: A list of string containing all the page no. to be extracted. Ex, [1, 2,...]
 
     Returns:
         A list of strings containing the texts of each page. If nothing's found it returns None.
     """
+    pdf_path = document.file_name
     try:
-        text_by_pages = []
-        with pdfplumber.open(pdf_path) as pdf:
+        return document.text_by_page(page_no_list)
 
-            if page_no_list is None:
-                pages_to_process = pdf.pages
-            else:
-                pages_to_process = [pdf.pages[page_no - 1] for page_no in page_no_list]
-
-            for page in pages_to_process:
-                text_by_pages.append(page.extract_text())
-
-        return text_by_pages
-
-    except FileNotFoundError:
-        print(f"Error: File ({pdf_path}) not found at path: {pdf_path}\n")
-        return None
     except IndexError:
         print(
-            "Error: Invalid page number specified while extracting PDF file ({pdf_path})!\n"
+            f"Error: Invalid page number specified while extracting PDF file ({pdf_path})!\n"
         )
         return None
     except Exception as e:
@@ -88,34 +76,65 @@ def get_value_between_keyphrases(
         return None
 
 
+# Header fields read from the first page of the PO
+PAGE1_FIELDS = [
+    Field("Purchase Order", "Purchase Order", "\n"),
+    Field("Vendor No", "Vendor No.", "Payment Terms"),
+    Field("Payment Terms", "Payment Terms", "Prices Including VAT No"),
+    Field("Document Date", "Document Date", "Shipment Method"),
+    Field("Shipment Method", "Shipment Method", "Order Type"),
+    Field("Order Type", "Order Type", "Shipping Agent"),
+    Field("Shipping Agent", "Shipping Agent", "\n"),
+    Field("Order for", "Order for", "\n"),
+    Field("Style No", "Qty", " "),
+    Field("HS Code", "HS Code:", "\n"),
+    Field("Price Including VAT", "Prices Including VAT", "\n"),
+]
+# Fields printed after the order lines, taken from the first page they're on
+SUMMARY_FIELDS = [
+    Field(
+        "Ship-to Address",
+        "Ship-to Address",
+        "Colour Code",
+        transform=lambda value: value.replace("\n", ", "),
+    ),
+    Field("Total Qty.", "Total Qty.", "\n"),
+]
+PAGE1_FIELD_SCANNER = FieldScanner(PAGE1_FIELDS)
+SUMMARY_FIELD_SCANNER = FieldScanner(SUMMARY_FIELDS)
+
+
 def get_static_values(
-    file_name: str, target_page_no: int
+    document: PdfDocument, target_page_no: int
 ) -> Tuple[Optional[int], Optional[int], Optional[bool], Dict[str, Any]]:
     print("Fetching static values...")
     print("=========================")
-    text_by_page = read_pdf(file_name)
+    # Only the target page (and the one after it) is read up front; the
+    # scans below extract the other pages' text lazily and stop early
+    text_by_page = read_pdf(document, [target_page_no])
 
     # Extracted static values dictionary
     static_values = {}
 
-    if text_by_page is not None and text_by_page is not []:
-        page1 = text_by_page[target_page_no - 1]
-        try:
-            page2 = text_by_page[target_page_no]
-        except:
-            page2 = ""
+    if text_by_page:
+        page1 = text_by_page[0]
+        total_page_no = document.page_count
+        page2 = (
+            document.page_text(target_page_no + 1)
+            if target_page_no < total_page_no
+            else ""
+        )
 
         # Find out the from what page the barcode starts from
-        total_page_no = len(text_by_page)
-        barcode_starting_page_no = len(text_by_page)
-        for i, page in enumerate(text_by_page):
+        barcode_starting_page_no = total_page_no
+        for page_no, page in document.iter_page_texts():
             if "Colour Code Colour Description Size Barcode" in page:
-                barcode_starting_page_no = i + 1
+                barcode_starting_page_no = page_no
                 break
 
-        # Extract Purchase Order
-        po_number = get_value_between_keyphrases(page1, "Purchase Order", "\n")
-        static_values["Purchase Order"] = po_number
+        # Extract the page 1 header fields
+        page1_values, missing_fields = PAGE1_FIELD_SCANNER.scan(page1)
+        static_values.update(page1_values)
 
         # Extract Buying House
         buying_house = get_value_before_keyphrase(page1, "Purchase Order")
@@ -127,83 +146,35 @@ def get_static_values(
         buying_house_address = (
             buying_house_address.split(buying_house)[1].replace("\n", " ").strip()
         )
-
         static_values["Buying House Address"] = buying_house_address
 
         # Extract Ship-to Address and Total Qty.
-        ship_to_address = None
-        total_qty = None
-        for page in text_by_page:
-            if ship_to_address is None:
-                ship_to_address = get_value_between_keyphrases(
-                    page, "Ship-to Address", "Colour Code"
-                )
-                ship_to_address = (
-                    ship_to_address.replace("\n", ", ")
-                    if ship_to_address is not None
-                    else ship_to_address
-                )
-            if total_qty is None:
-                total_qty = get_value_after_keyphrase(page, "Total Qty.")
-                total_qty = (
-                    total_qty.split("\n")[0] if total_qty is not None else total_qty
-                )
+        #   Both are printed above the barcode table, so the pages after the
+        #   barcode starting page are never scanned
+        summary_values, missing_summary_fields = SUMMARY_FIELD_SCANNER.scan_pages(
+            page
+            for _page_no, page in document.iter_page_texts(
+                last_page_no=barcode_starting_page_no
+            )
+        )
+        missing_fields.extend(missing_summary_fields)
+        ship_to_address = summary_values["Ship-to Address"]
+        total_qty = summary_values["Total Qty."]
         static_values["Ship-to Address"] = (
             ship_to_address if ship_to_address is not None else ""
         )
         static_values["Total Qty."] = total_qty if total_qty is not None else "0"
 
-        # Extract Vendor No
-        vendor_no = get_value_between_keyphrases(page1, "Vendor No.", "Payment Terms")
-        static_values["Vendor No"] = vendor_no
-
-        # Extract Payment Terms
-        payment_temrs = get_value_between_keyphrases(
-            page1, "Payment Terms", "Prices Including VAT No"
-        )
-        static_values["Payment Terms"] = payment_temrs
-
-        # Extract Document Date
-        document_date = get_value_between_keyphrases(
-            page1, "Document Date", "Shipment Method"
-        )
-        static_values["Document Date"] = document_date
-
-        # Extract Shipment Method
-        shipment_method = get_value_between_keyphrases(
-            page1, "Shipment Method", "Order Type"
-        )
-        static_values["Shipment Method"] = shipment_method
-
-        # Extract Order Type
-        order_type = get_value_between_keyphrases(page1, "Order Type", "Shipping Agent")
-        static_values["Order Type"] = order_type
-
-        # Extract Shipment Agent
-        shipping_agent = get_value_between_keyphrases(page1, "Shipping Agent", "\n")
-        static_values["Shipping Agent"] = shipping_agent
-
-        # Exract Order for
-        order_for = get_value_between_keyphrases(page1, "Order for", "\n")
-        static_values["Order for"] = order_for
-
-        # Extract Style No
-        style_no = get_value_between_keyphrases(page1, "Qty", " ")
-        static_values["Style No"] = style_no
-
         # Extract Style Description
-        style_description = get_value_between_keyphrases(page1, str(style_no), "\n")
+        style_no = static_values["Style No"]
+        hs_code = static_values["HS Code"]
+        style_description = find_between(page1, str(style_no), "\n")
+        if style_description is None:
+            missing_fields.append("Style Description")
         static_values["Style Description"] = style_description
 
-        # Extract HS Code
-        hs_code = get_value_between_keyphrases(page1, "HS Code:", "\n")
-        static_values["HS Code"] = hs_code
-
-        # Extract Price Including VAT
-        price_including_vat = get_value_between_keyphrases(
-            page1, "Prices Including VAT", "\n"
-        )
-        static_values["Price Including VAT"] = price_including_vat
+        if missing_fields:
+            print(f"Error: Couldn't find value for ({", ".join(missing_fields)})!")
 
         # Find if 'ASS' is present in the file
         contains_ASS = False
@@ -0,0 +1,326 @@
+import math
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from ._backends import CamelotStreamBackend, TableBackend
+from ._cache import PageTableCache
+from ._document import LAYOUT_KWARGS, PdfDocument
+
+# Reads the table of (document, page no., table areas) without camelot, or
+# returns None when the page doesn't suit it
+PageParser = Callable[[PdfDocument, int, List[str]], Optional[pd.DataFrame]]
+
+
+def table_areas_below(
+    width: float,
+    height: float,
+    header_offset: int,
+    x_bounds: Optional[Tuple[float, float]] = None,
+) -> List[str]:
+    """
+    Returns the camelot table area covering a (width, height) page below
+    `header_offset`, between the (left, right) `x_bounds` if given.
+    """
+    # Format: 'x1,y1,x2,y2'
+    if x_bounds is None:
+        return [f"0,{height-header_offset},{width}, 0"]
+    left, right = x_bounds
+    return [f"{left},{height-header_offset},{right},0"]
+
+
+def get_table_areas(document: PdfDocument, header_offset: int) -> List[str]:
+    """
+    Returns the camelot table area covering the page below `header_offset`.
+    """
+    # The dimensions are stored in the `dim` variable as a tuple: (width, height)
+    width, height = document.page_dimensions()
+    return table_areas_below(width, height, header_offset)
+
+
+def _parser_name(page_parser: PageParser) -> str:
+    # A partial is named after the function it wraps
+    return getattr(page_parser, "func", page_parser).__name__
+
+
+def _table_cache_keys(
+    table_cache: PageTableCache,
+    document: PdfDocument,
+    page_no: int,
+    table_areas: List[str],
+    page_parser: Optional[PageParser],
+    backend: TableBackend,
+) -> List[str]:
+    """
+    Returns the keys a page's table can be cached under: the page parser's
+    (if any) first, then the backend's.
+    """
+    names = [backend.name]
+    if page_parser is not None:
+        names.insert(0, _parser_name(page_parser))
+    return [
+        table_cache.key(document.digest, page_no, table_areas, LAYOUT_KWARGS, name)
+        for name in names
+    ]
+
+
+def _load_cached_table(
+    table_cache: PageTableCache, keys: List[str]
+) -> Optional[pd.DataFrame]:
+    """
+    Returns the table cached under the first of `keys` that has an entry.
+
+    Raises:
+        KeyError: If none of `keys` has an entry.
+    """
+    for key in keys:
+        try:
+            return table_cache.load(key)
+        except KeyError:
+            pass
+    raise KeyError(keys[-1])
+
+
+def iter_page_tables(
+    document: PdfDocument,
+    table_areas_by_page: Dict[int, List[str]],
+    table_cache: Optional[PageTableCache] = None,
+    page_parser: Optional[PageParser] = None,
+    backend: Optional[TableBackend] = None,
+) -> Iterator[Tuple[int, Optional[pd.DataFrame]]]:
+    """
+    Extracts the tables of a whole page range in one pass.
+
+    A single table backend (by default camelot's stream flavour) walks the
+    pages in order over the cached layouts of `document`, using the table
+    areas given for each page. With a `table_cache`, pages already in the
+    cache are replayed from it without parsing the page, and newly parsed
+    tables are added to it.
+
+    Args:
+        document: The open PDF document session.
+        table_areas_by_page: Page no. -> camelot table areas ('x1,y1,x2,y2').
+        table_cache: The persistent page table cache, if any.
+        page_parser: A faster parser tried before the backend on pages that
+                     are not in the cache. Its tables are cached under its
+                     own (function) name, the backend's under the backend's.
+        backend: The table backend to read the pages with.
+
+    Yields:
+        (page no., the last table found on that page or None if none was found)
+    """
+    if backend is None:
+        backend = CamelotStreamBackend()
+    added_to_cache = False
+
+    for page_no in sorted(table_areas_by_page):
+        table_areas = table_areas_by_page[page_no]
+
+        if table_cache is not None:
+            keys = _table_cache_keys(
+                table_cache, document, page_no, table_areas, page_parser, backend
+            )
+            try:
+                yield page_no, _load_cached_table(table_cache, keys)
+                continue
+            except KeyError:
+                pass
+
+        df = None
+        if page_parser is not None:
+            df = page_parser(document, page_no, table_areas)
+        parsed = df is not None
+        if not parsed:
+            df = backend.read_table(document, page_no, table_areas)
+
+        if table_cache is not None:
+            # A parsed table goes under the parser's key, the first one
+            table_cache.put(keys[0] if parsed else keys[-1], df, evict=False)
+            added_to_cache = True
+
+        yield page_no, df
+
+    if added_to_cache:
+        table_cache.evict()
+
+
+def read_page_tables(
+    document: PdfDocument,
+    table_areas_by_page: Dict[int, List[str]],
+    table_cache: Optional[PageTableCache] = None,
+    page_parser: Optional[PageParser] = None,
+    backend: Optional[TableBackend] = None,
+) -> Dict[int, Optional[pd.DataFrame]]:
+    """
+    Same as `iter_page_tables`, collected into a page no. -> table mapping.
+    """
+    return dict(
+        iter_page_tables(
+            document, table_areas_by_page, table_cache, page_parser, backend
+        )
+    )
+
+
+# The document a worker process has open, kept across the chunks it reads
+# while its pool lives (e.g. every window of a streamed PO)
+_worker_document: Optional[PdfDocument] = None
+
+
+def _open_worker_document(file_name: str) -> PdfDocument:
+    global _worker_document
+    if _worker_document is None or _worker_document.file_name != file_name:
+        if _worker_document is not None:
+            _worker_document.close()
+        _worker_document = PdfDocument(file_name)
+    return _worker_document
+
+
+def _read_page_tables_from_file(
+    file_name: str,
+    table_areas_by_page: Dict[int, List[str]],
+    table_cache: Optional[PageTableCache],
+    page_parser: Optional[PageParser],
+    backend: TableBackend,
+) -> Tuple[Dict[int, Optional[pd.DataFrame]], TableBackend]:
+    document = _open_worker_document(file_name)
+    page_tables = read_page_tables(
+        document, table_areas_by_page, table_cache, page_parser, backend
+    )
+    # Only the document stays open, not the pages read
+    for page_no in table_areas_by_page:
+        document.release_page(page_no)
+    # The worker's copy of the backend is sent back for its timings
+    return page_tables, backend
+
+
+def read_page_tables_parallel(
+    document: PdfDocument,
+    table_areas_by_page: Dict[int, List[str]],
+    workers: int,
+    table_cache: Optional[PageTableCache] = None,
+    page_parser: Optional[PageParser] = None,
+    backend: Optional[TableBackend] = None,
+    executor: Optional[Executor] = None,
+) -> Dict[int, Optional[pd.DataFrame]]:
+    """
+    Same as `read_page_tables`, but splits the pages into contiguous chunks
+    and reads each chunk in its own worker process.
+
+    Every worker opens its own session on the document's file, since the
+    parsed layouts can't be shared across processes. Pages found in
+    `table_cache` are replayed in this process and never sent to a worker.
+    A `page_parser` must be picklable (a module level function or a partial
+    of one). The workers' backend timings are added to `backend`.
+
+    The chunks run on `executor` if given (a process pool of `workers`
+    workers), so one pool can serve many calls. Otherwise a pool is started
+    for this call.
+    """
+    if backend is None:
+        backend = CamelotStreamBackend()
+
+    page_tables = {}
+    if table_cache is not None:
+        for page_no, table_areas in table_areas_by_page.items():
+            keys = _table_cache_keys(
+                table_cache, document, page_no, table_areas, page_parser, backend
+            )
+            try:
+                page_tables[page_no] = _load_cached_table(table_cache, keys)
+            except KeyError:
+                pass
+
+    page_numbers = sorted(set(table_areas_by_page) - set(page_tables))
+    if workers <= 1 or len(page_numbers) <= 1:
+        page_tables.update(
+            read_page_tables(
+                document,
+                {page_no: table_areas_by_page[page_no] for page_no in page_numbers},
+                table_cache,
+                page_parser,
+                backend,
+            )
+        )
+        return page_tables
+
+    chunk_size = math.ceil(len(page_numbers) / workers)
+    chunks = [
+        {
+            page_no: table_areas_by_page[page_no]
+            for page_no in page_numbers[i : i + chunk_size]
+        }
+        for i in range(0, len(page_numbers), chunk_size)
+    ]
+
+    if executor is not None:
+        chunk_results = executor.map(
+            _read_page_tables_from_file,
+            repeat(document.file_name),
+            chunks,
+            repeat(table_cache),
+            repeat(page_parser),
+            repeat(backend),
+        )
+        for chunk_tables, worker_backend in chunk_results:
+            page_tables.update(chunk_tables)
+            backend.add_timings(worker_backend)
+        return page_tables
+
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        return read_page_tables_parallel(
+            document,
+            table_areas_by_page,
+            workers,
+            table_cache,
+            page_parser,
+            backend,
+            executor,
+        )
+
+
+def iter_page_tables_parallel(
+    document: PdfDocument,
+    table_areas_by_page: Dict[int, List[str]],
+    workers: int,
+    window_pages: int,
+    table_cache: Optional[PageTableCache] = None,
+    page_parser: Optional[PageParser] = None,
+    backend: Optional[TableBackend] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[Tuple[int, Optional[pd.DataFrame]]]:
+    """
+    Same as `iter_page_tables`, but reads the pages `window_pages` at a time
+    with `read_page_tables_parallel`, so only one window of tables is held at
+    once however many pages there are.
+
+    Every window runs on the same process pool, `executor` if given or else
+    one started for the whole iteration, so the workers (and their open
+    document) are only started once.
+    """
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from iter_page_tables_parallel(
+                document,
+                table_areas_by_page,
+                workers,
+                window_pages,
+                table_cache,
+                page_parser,
+                backend,
+                executor,
+            )
+        return
+
+    page_numbers = sorted(table_areas_by_page)
+    for i in range(0, len(page_numbers), window_pages):
+        window = {
+            page_no: table_areas_by_page[page_no]
+            for page_no in page_numbers[i : i + window_pages]
+        }
+        page_tables = read_page_tables_parallel(
+            document, window, workers, table_cache, page_parser, backend, executor
+        )
+        for page_no in sorted(window):
+            yield page_no, page_tables.pop(page_no)
@@ -0,0 +1,119 @@
+from typing import List, NamedTuple, Optional, Tuple
+
+from ._document import PdfDocument
+from ._tables import table_areas_below
+
+
+class Template(NamedTuple):
+    """
+    A known PO layout, recognised by keyphrases on its first page.
+
+    Args:
+        name: The template's name, used in messages.
+        keyphrases: Text that is on the first page of every PO of this layout.
+        header_offset: Height (pt) of the page header above the order lines.
+        continuation_header_offset: Same, for a page that continues a style
+                                    split cut by the previous page break.
+        barcode_header_offset: Height (pt) of the page header above the
+                               barcode table.
+        supported: Whether the extractor can read this layout.
+        page_size: The (width, height) (pt, rounded) of the pages the table
+                   bounds below were measured on. Pages of any other size
+                   are read across their full width.
+        order_lines_x: The (left, right) edges (pt) the order line tables
+                       (and the continued ones) are read between.
+        barcodes_x: The same, for the barcode tables.
+    """
+
+    name: str
+    keyphrases: Tuple[str, ...]
+    header_offset: int = 350
+    continuation_header_offset: int = 300
+    barcode_header_offset: int = 300
+    supported: bool = True
+    page_size: Optional[Tuple[int, int]] = None
+    order_lines_x: Optional[Tuple[float, float]] = None
+    barcodes_x: Optional[Tuple[float, float]] = None
+
+
+class TableAreas(NamedTuple):
+    """
+    The camelot table areas ('x1,y1,x2,y2') of each kind of page of a PO.
+    """
+
+    order_lines: List[str]
+    continuation: List[str]
+    barcodes: List[str]
+
+
+# With and without prepacks POs share this layout; which one a PO is, is
+# told apart by its 'ASS' column while fetching the static values. On the
+# sample A4 POs of both, the order lines' text lies within x 30-420 and the
+# barcodes' within x 29-548, so camelot is given those columns (plus a
+# margin) instead of the whole page width
+US_POLO = Template(
+    "US Polo",
+    ("Purchase Order", "Vendor No.", "Prices Including VAT"),
+    page_size=(595, 842),
+    order_lines_x=(20, 440),
+    barcodes_x=(20, 570),
+)
+BEST_AND_LESS = Template(
+    "Best & Less",
+    ("Purchase Order Number:", "Pre-Pack SKU Number:"),
+    supported=False,
+)
+TEMPLATES = [US_POLO, BEST_AND_LESS]
+
+# Used for POs that match no template, as before templates were detected
+DEFAULT_TEMPLATE = US_POLO
+
+
+def identify_template(page_text: str) -> Optional[Template]:
+    """
+    Returns the template whose keyphrases are all in the first page's text,
+    or None if the layout is not a known one.
+    """
+    for template in TEMPLATES:
+        if all(keyphrase in page_text for keyphrase in template.keyphrases):
+            return template
+    return None
+
+
+def get_template_table_areas(
+    template: Template, width: float, height: float
+) -> TableAreas:
+    """
+    Returns the table areas of a template on pages of the given size: the
+    page below the template's header offset for each kind of page, narrowed
+    to the template's table bounds if they were measured on this page size.
+    """
+    order_lines_x = barcodes_x = None
+    if template.page_size == (round(width), round(height)):
+        order_lines_x, barcodes_x = template.order_lines_x, template.barcodes_x
+    return TableAreas(
+        table_areas_below(width, height, template.header_offset, order_lines_x),
+        table_areas_below(
+            width, height, template.continuation_header_offset, order_lines_x
+        ),
+        table_areas_below(width, height, template.barcode_header_offset, barcodes_x),
+    )
+
+
+def detect_layout(document: PdfDocument) -> Tuple[Template, TableAreas]:
+    """
+    Identifies the template of a PO from its first page and returns it with
+    its table areas.
+
+    Raises:
+        ValueError: If the PO is of a known layout the extractor can't read.
+    """
+    template = identify_template(document.page_text(1))
+    if template is None:
+        print(f"Warning: Unknown PO layout, reading it as {DEFAULT_TEMPLATE.name}.")
+        template = DEFAULT_TEMPLATE
+    elif not template.supported:
+        raise ValueError(f"{template.name} POs are not supported yet!")
+
+    width, height = document.page_dimensions()
+    return template, get_template_table_areas(template, width, height)